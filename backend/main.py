@@ -5,32 +5,59 @@ FastAPI application for extracting data from SMS service invoices
 
 from fastapi import FastAPI, UploadFile, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, FileResponse, HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse, FileResponse, HTMLResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from typing import List
+from starlette.types import ASGIApp, Receive, Scope, Send
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import BinaryIO, Dict, Iterator, List, Tuple, Union
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
+import multiprocessing
 import tempfile
+import asyncio
 import os
 import io
 
 from models import InvoiceData, ErrorDetail, ProcessResponse, DebugResult, DebugResponse, HealthResponse, RootResponse
 from logging_config import logger
-from services.pdf_extractor import extract_text_from_pdf
+from services.pdf_extractor import PARALLEL_PAGE_THRESHOLD, count_pages, extract_text_from_pdf
 from services.invoice_detector import detect_invoice_type
 from services.excel_generator import generate_excel
-from parsers.cloudxp_parser import CloudXPParser
-from parsers.rjil_parser import RJILParser
-from parsers.jtl_parser import JTLParser
+from services.invoice_processor import process_invoice_file
+
+# Rate limiter: in-memory by default; point RATE_LIMIT_STORAGE at a shared backend
+# (e.g. redis://host:6379/0) so multiple Uvicorn workers share one budget
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=os.environ.get("RATE_LIMIT_STORAGE", "memory://")
+)
+
+# Process pool for CPU-bound PDF extraction and parsing.
+# forkserver keeps workers from inheriting (and re-importing) the FastAPI app.
+# Each Uvicorn worker builds its own pool, so lower PARSER_WORKERS when running
+# several of them (e.g. cpu_count / N with --workers N).
+_mp_context = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+PARSER_WORKERS = int(os.environ.get("PARSER_WORKERS", 0)) or os.cpu_count()
+executor = ProcessPoolExecutor(max_workers=PARSER_WORKERS, mp_context=_mp_context)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    executor.shutdown(wait=True, cancel_futures=True)
 
-# Rate limiter
-limiter = Limiter(key_func=get_remote_address)
 
 app = FastAPI(
     title="Invoice Data Extraction API",
     description="Extract data from CloudXP, RJIL, and JTL invoices for Tally import",
-    version="1.1.0"
+    version="1.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # fast encoding for large data/raw_text payloads
 )
 
 app.state.limiter = limiter
@@ -54,24 +81,92 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class SelectiveGZipMiddleware:
+    """GZipMiddleware that passes the responses of some paths through uncompressed."""
+
+    def __init__(self, app: ASGIApp, exclude_paths: Tuple[str, ...] = (), **gzip_options) -> None:
+        self.app = app
+        self.gzip_app = GZipMiddleware(app, **gzip_options)
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip_app(scope, receive, send)
+
+
+# Compress larger responses (extracted text in /api/debug compresses 5-10x);
+# the XLSX export is already deflate-compressed, so it is sent as is
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1024, exclude_paths=("/api/export",))
+
 # File validation constants
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50 MB
 PDF_MAGIC_BYTES = b"%PDF"
+MAGIC_CHUNK_SIZE = 8 * 1024  # first read, checked for PDF magic bytes
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB
+SPOOL_MAX_SIZE = 8 * 1024 * 1024  # uploads above 8 MB are spilled to disk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # 64 KB
 
-# Initialize parsers
-parsers = {
-    "cloudxp": CloudXPParser(),
-    "rjil": RJILParser(),
-    "jtl": JTLParser()
-}
 
+async def read_upload(file: UploadFile) -> Union[bytes, str]:
+    """
+    Read an upload in chunks, validating it is a PDF within size limits.
+
+    The PDF magic bytes are checked on the first chunk (filename extensions are
+    not trusted) and the size limit is enforced while reading, so invalid
+    uploads fail without being read in full.
+    Files stay in memory up to SPOOL_MAX_SIZE and are spilled to a temp file
+    beyond that.
 
-def validate_pdf(content: bytes, filename: str) -> None:
-    """Validate that the uploaded file is a real PDF within size limits."""
-    if len(content) > MAX_FILE_SIZE:
-        raise ValueError(f"File exceeds maximum size of {MAX_FILE_SIZE // (1024 * 1024)}MB")
-    if not content[:4].startswith(PDF_MAGIC_BYTES):
-        raise ValueError("File is not a valid PDF (invalid magic bytes)")
+    Returns:
+        The PDF bytes, or the path of a temp file (caller is responsible for deleting it)
+    """
+    first = await file.read(MAGIC_CHUNK_SIZE)
+    if not first.startswith(PDF_MAGIC_BYTES):
+        raise ValueError("Not a PDF file")
+
+    buffer = io.BytesIO(first)
+    buffer.seek(0, io.SEEK_END)
+    total = len(first)
+    tmp = None
+
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            total += len(chunk)
+            if total > MAX_FILE_SIZE:
+                raise ValueError(f"File exceeds maximum size of {MAX_FILE_SIZE // (1024 * 1024)}MB")
+            if tmp is None and total > SPOOL_MAX_SIZE:
+                tmp = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+                tmp.write(buffer.getbuffer())
+                buffer = tmp
+            buffer.write(chunk)
+    except BaseException:
+        if tmp is not None:
+            tmp.close()
+            os.unlink(tmp.name)
+        raise
+
+    if tmp is not None:
+        tmp.close()
+        return tmp.name
+    return buffer.getvalue()
+
+
+def iter_buffer(buffer: BinaryIO, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a generated file in fixed-size chunks for StreamingResponse, then close it."""
+    try:
+        buffer.seek(0)
+        while chunk := buffer.read(chunk_size):
+            yield chunk
+    finally:
+        buffer.close()
+
+
+def discard_upload(source: Union[bytes, str]) -> None:
+    """Delete the temp file behind a spilled upload, if any."""
+    if isinstance(source, str) and os.path.exists(source):
+        os.unlink(source)
 
 
 @app.get("/", response_model=RootResponse)
@@ -84,11 +179,24 @@ async def health_check():
     return {"status": "healthy"}
 
 
-@app.post("/api/process", response_model=ProcessResponse)
-@limiter.limit("30/minute")
-async def process_invoices(request: Request, files: List[UploadFile] = File(...)):
+async def _is_long_pdf(source: Union[bytes, str]) -> bool:
+    """Whether a PDF has enough pages to be worth extracting across the pool."""
+    try:
+        return await asyncio.to_thread(count_pages, source) >= PARALLEL_PAGE_THRESHOLD
+    except Exception:
+        # Unreadable PDFs go to a worker, which reports the error
+        return False
+
+
+async def _process_all(files: List[UploadFile]) -> Tuple[List[Dict], List[Dict]]:
     """
-    Process uploaded PDF invoices and return extracted data.
+    Validate, extract and parse all uploaded PDFs.
+
+    Shared by the process and export endpoints so each request parses its
+    files exactly once.
+
+    Returns:
+        Tuple of (parsed invoice rows, error details)
     """
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded")
@@ -96,81 +204,80 @@ async def process_invoices(request: Request, files: List[UploadFile] = File(...)
     logger.info("Processing %d file(s)", len(files))
     results = []
     errors = []
+    pending = []  # (filename, bytes or temp path) for files handed to the process pool
 
-    for file in files:
-        if not file.filename.lower().endswith('.pdf'):
-            logger.warning("Skipped non-PDF file: %s", file.filename)
-            errors.append({"filename": file.filename, "error": "Not a PDF file"})
-            continue
-
-        try:
-            content = await file.read()
-
-            # Validate file content
+    try:
+        for file in files:
             try:
-                validate_pdf(content, file.filename)
-            except ValueError as ve:
-                logger.warning("Validation failed for %s: %s", file.filename, str(ve))
-                errors.append({"filename": file.filename, "error": str(ve)})
-                continue
-
-            # Save uploaded file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-                tmp.write(content)
-                tmp_path = tmp.name
-
-            try:
-                # Extract text from PDF
-                text = extract_text_from_pdf(tmp_path)
-
-                if not text.strip():
-                    logger.warning("No text extracted from %s", file.filename)
-                    errors.append({
-                        "filename": file.filename,
-                        "error": "Could not extract text from PDF"
-                    })
+                # Read upload in chunks, validating as we go
+                try:
+                    source = await read_upload(file)
+                except ValueError as ve:
+                    logger.warning("Validation failed for %s: %s", file.filename, str(ve))
+                    errors.append({"filename": file.filename, "error": str(ve)})
                     continue
 
-                # Detect invoice type
-                invoice_type = detect_invoice_type(text)
+                pending.append((file.filename, source))
 
-                if invoice_type == "unknown":
-                    logger.warning("Unknown invoice type for %s", file.filename)
-                    errors.append({
-                        "filename": file.filename,
-                        "error": "Could not detect invoice type. Supported: CloudXP, RJIL, JTL"
-                    })
-                    continue
-
-                # Parse invoice
-                parser = parsers[invoice_type]
-                data = parser.parse(text, file.filename)
-                data["invoice_type"] = invoice_type
-                data["filename"] = file.filename
+            except Exception as e:
+                logger.error("Error processing %s: %s", file.filename, str(e))
+                errors.append({
+                    "filename": file.filename,
+                    "error": str(e)
+                })
 
-                logger.info("Parsed %s as %s (Invoice: %s)", file.filename, invoice_type, data.get("invoice_no", "N/A"))
-                results.append(data)
+        loop = asyncio.get_running_loop()
+        if len(pending) == 1 and await _is_long_pdf(pending[0][1]):
+            # A long lone PDF would occupy a single worker; process it on a thread
+            # instead and let it spread its pages across the pool
+            filename, source = pending[0]
+            outcomes = await asyncio.gather(
+                loop.run_in_executor(None, process_invoice_file, source, filename, executor, PARSER_WORKERS),
+                return_exceptions=True
+            )
+        else:
+            # Extract, detect and parse all files in parallel across worker processes
+            outcomes = await asyncio.gather(
+                *(loop.run_in_executor(executor, process_invoice_file, source, filename)
+                  for filename, source in pending),
+                return_exceptions=True
+            )
+
+    finally:
+        # Clean up temp files of spilled uploads
+        for _, source in pending:
+            discard_upload(source)
+
+    for (filename, _), outcome in zip(pending, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error("Error processing %s: %s", filename, str(outcome))
+            errors.append({"filename": filename, "error": str(outcome)})
+        elif "error" in outcome:
+            errors.append(outcome)
+        else:
+            logger.info("Parsed %s as %s (Invoice: %s)", filename, outcome["invoice_type"], outcome.get("invoice_no", "N/A"))
+            results.append(outcome)
 
-            finally:
-                # Clean up temp file
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
+    logger.info("Processing complete: %d success, %d errors", len(results), len(errors))
+    return results, errors
 
-        except Exception as e:
-            logger.error("Error processing %s: %s", file.filename, str(e))
-            errors.append({
-                "filename": file.filename,
-                "error": str(e)
-            })
 
-    logger.info("Processing complete: %d success, %d errors", len(results), len(errors))
-    return {
+@app.post("/api/process", responses={200: {"model": ProcessResponse}})
+@limiter.limit("30/minute")
+async def process_invoices(request: Request, files: List[UploadFile] = File(...)):
+    """
+    Process uploaded PDF invoices and return extracted data.
+    """
+    results, errors = await _process_all(files)
+    # Parser output is trusted internal data, so skip re-validating every row;
+    # ProcessResponse is kept above for the OpenAPI schema only
+    return ORJSONResponse({
         "success": True,
         "processed": len(results),
         "errors": len(errors),
         "data": results,
         "error_details": errors
-    }
+    })
 
 
 @app.post("/api/export")
@@ -180,22 +287,24 @@ async def export_to_excel(request: Request, files: List[UploadFile] = File(...))
     Process uploaded PDF invoices and return Excel file for Tally import.
     """
     # First process all invoices
-    process_result = await process_invoices(request, files)
+    results, errors = await _process_all(files)
 
-    if not process_result["data"]:
+    if not results:
         raise HTTPException(
             status_code=400,
-            detail="No invoices could be processed. " +
-                   str(process_result.get("error_details", []))
+            detail="No invoices could be processed. " + str(errors)
         )
 
     # Generate Excel file
-    logger.info("Generating Excel with %d invoices", len(process_result["data"]))
-    excel_buffer = generate_excel(process_result["data"])
+    logger.info("Generating Excel with %d invoices", len(results))
+    # Write straight into a spooled file so large workbooks spill to disk
+    # instead of sitting in memory until the download finishes
+    excel_file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    generate_excel(results, excel_file)
 
     # Return as downloadable file
     return StreamingResponse(
-        io.BytesIO(excel_buffer.getvalue()),
+        iter_buffer(excel_file),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={
             "Content-Disposition": "attachment; filename=tally_import.xlsx"
@@ -211,20 +320,19 @@ async def export_to_csv(request: Request, files: List[UploadFile] = File(...)):
     """
     from services.csv_generator import generate_csv
 
-    process_result = await process_invoices(request, files)
+    results, errors = await _process_all(files)
 
-    if not process_result["data"]:
+    if not results:
         raise HTTPException(
             status_code=400,
-            detail="No invoices could be processed. " +
-                   str(process_result.get("error_details", []))
+            detail="No invoices could be processed. " + str(errors)
         )
 
-    logger.info("Generating CSV with %d invoices", len(process_result["data"]))
-    csv_buffer = generate_csv(process_result["data"])
+    logger.info("Generating CSV with %d invoices", len(results))
+    csv_buffer = generate_csv(results)
 
     return StreamingResponse(
-        io.BytesIO(csv_buffer.getvalue()),
+        iter_buffer(csv_buffer),
         media_type="text/csv",
         headers={
             "Content-Disposition": "attachment; filename=tally_import.csv"
@@ -243,24 +351,16 @@ async def debug_pdf(files: List[UploadFile] = File(...)):
     results = []
 
     for file in files:
-        if not file.filename.lower().endswith('.pdf'):
-            continue
-
         try:
-            content = await file.read()
-
             try:
-                validate_pdf(content, file.filename)
+                source = await read_upload(file)
             except ValueError as ve:
                 results.append({"filename": file.filename, "error": str(ve)})
                 continue
 
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-                tmp.write(content)
-                tmp_path = tmp.name
-
             try:
-                text = extract_text_from_pdf(tmp_path)
+                # Keep CPU-bound extraction off the event loop
+                text = await asyncio.to_thread(extract_text_from_pdf, source)
                 invoice_type = detect_invoice_type(text)
                 results.append({
                     "filename": file.filename,
@@ -268,8 +368,7 @@ async def debug_pdf(files: List[UploadFile] = File(...)):
                     "raw_text": text
                 })
             finally:
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
+                discard_upload(source)
 
         except Exception as e:
             results.append({
@@ -285,13 +384,24 @@ if HAS_STATIC:
     # Mount static assets (js, css, etc.)
     app.mount("/assets", StaticFiles(directory=os.path.join(STATIC_DIR, "assets")), name="assets")
 
+    # Load index.html and the static file listing once instead of per request
+    INDEX_PATH = os.path.join(STATIC_DIR, "index.html")
+    INDEX_HTML = None
+    if os.path.isfile(INDEX_PATH):
+        with open(INDEX_PATH, "rb") as f:
+            INDEX_HTML = f.read()
+
+    STATIC_FILES = {
+        os.path.relpath(os.path.join(root, name), STATIC_DIR).replace(os.sep, "/")
+        for root, _, names in os.walk(STATIC_DIR)
+        for name in names
+    }
+
     # Serve index.html for the root path
     @app.get("/", response_class=HTMLResponse)
     async def serve_frontend():
-        index_path = os.path.join(STATIC_DIR, "index.html")
-        if os.path.exists(index_path):
-            with open(index_path, "r") as f:
-                return HTMLResponse(content=f.read())
+        if INDEX_HTML is not None:
+            return HTMLResponse(content=INDEX_HTML)
         return HTMLResponse(content="Frontend not found", status_code=404)
 
     # Catch-all for SPA routing (except /api paths)
@@ -302,14 +412,12 @@ if HAS_STATIC:
             return {"error": "Not found"}
 
         # Try to serve static file first
-        static_file = os.path.join(STATIC_DIR, path)
-        if os.path.exists(static_file) and os.path.isfile(static_file):
-            return FileResponse(static_file)
+        if path in STATIC_FILES:
+            return FileResponse(os.path.join(STATIC_DIR, path))
 
         # Fall back to index.html for SPA routing
-        index_path = os.path.join(STATIC_DIR, "index.html")
-        if os.path.exists(index_path):
-            return FileResponse(index_path)
+        if INDEX_HTML is not None:
+            return HTMLResponse(content=INDEX_HTML)
 
         return {"error": "Not found"}
 
@@ -4,14 +4,16 @@ Provides common utilities for invoice parsing
 """
 
 import re
+import calendar
+import functools
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import Dict, Optional, Tuple, Union
 from datetime import datetime
-from dateutil.relativedelta import relativedelta
 
 
 # GST State Code to State Name mapping (India)
-GST_STATE_CODES = {
+GST_STATE_CODES = MappingProxyType({
     "01": "Jammu & Kashmir",
     "02": "Himachal Pradesh",
     "03": "Punjab",
@@ -50,34 +52,194 @@ GST_STATE_CODES = {
     "36": "Telangana",
     "37": "Andhra Pradesh (New)",
     "38": "Ladakh",
+})
+
+# State names indexed by int(state code), so lookups skip hashing
+_STATE_TUPLE = tuple(GST_STATE_CODES.get(f"{i:02d}", "") for i in range(40))
+
+# Month names accepted in dates like 12-Dec-2025 / 12-December-2025
+MONTHS = {
+    "jan": "01", "feb": "02", "mar": "03", "apr": "04", "may": "05", "jun": "06",
+    "jul": "07", "aug": "08", "sep": "09", "oct": "10", "nov": "11", "dec": "12",
+    "january": "01", "february": "02", "march": "03", "april": "04", "june": "06",
+    "july": "07", "august": "08", "september": "09", "october": "10",
+    "november": "11", "december": "12",
 }
 
+# Date shapes handled by format_date without strptime
+_NUMERIC_DATE_RE = re.compile(r"^(\d{1,2})([./-])(\d{1,2})\2(\d{4})$")  # 12.12.2025, 12-12-2025, 12/12/2025
+_MONTH_NAME_DATE_RE = re.compile(r"^(\d{1,2})-([A-Za-z]+)-(\d{4})$")  # 12-Dec-2025, 12-December-2025
+_ISO_DATE_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")  # 2025-12-12
+
+# Invoice period "from <sep> to" split. Alternatives keep the separator priority
+# " - ", " to ", "-", "–" so "01-Nov-2025 to 30-Nov-2025" splits on " to ".
+_PERIOD_SPLIT_RE = re.compile(r"^(.*?) - (.*)$|^(.*?) to (.*)$|^(.*?)-(.*)$|^(.*?)–(.*)$", re.DOTALL)
+
+# Place-of-supply cleanup patterns
+_STATE_PREFIX_RE = re.compile(r'^\d{2}\s*')
+_STATE_SUFFIX_RE = re.compile(r'[,\s]*\d+$')
+
+# "Bulk SMS Service -" prefix stripped from remarks by every parser
+BULK_PREFIX_RE = re.compile(r'^Bulk\s*SMS\s*Service\s*[-:]\s*', re.IGNORECASE)
+
+# Max characters a table row pattern may span from its anchor word
+TABLE_WINDOW = 512
+
+
+# Flags every field pattern is compiled with unless a caller asks otherwise
+FIELD_FLAGS = re.IGNORECASE | re.MULTILINE | re.DOTALL
+
+
+@functools.lru_cache(maxsize=512)
+def _compiled(pattern: str, flags: int = FIELD_FLAGS) -> re.Pattern:
+    """
+    Compile a field pattern once per (pattern, flags).
+    
+    Kept separate from re's own cache so unrelated regex use elsewhere in
+    the process can never evict the parsers' patterns.
+    """
+    return re.compile(pattern, flags)
+
+
+@functools.lru_cache(maxsize=32)
+def _compiled_spec(spec_items: Tuple[Tuple[str, str], ...]) -> Tuple[Tuple[str, re.Pattern], ...]:
+    """Compile every pattern of a field spec once."""
+    return tuple((name, _compiled(pattern)) for name, pattern in spec_items)
+
+
+def _format_dmy(day: str, month: str, year: str) -> Optional[str]:
+    """Return DD/MM/YYYY if day/month/year form a real date, else None."""
+    d, m, y = int(day), int(month), int(year)
+    if y < 1 or not 1 <= m <= 12 or not 1 <= d <= calendar.monthrange(y, m)[1]:
+        return None
+    return f"{d:02d}/{m:02d}/{y:04d}"
+
+
+def _state_from_gst(gst_number: Optional[str]) -> str:
+    """Look up the state name for the 2-digit code at the start of a GST number."""
+    if not gst_number:
+        return ""
+    code = gst_number[:2]
+    if len(code) < 2 or not (code.isascii() and code.isdigit()):
+        return ""
+    index = int(code)
+    return _STATE_TUPLE[index] if index < len(_STATE_TUPLE) else ""
+
 
 class BaseParser(ABC):
     """Base class for invoice parsers with common utility methods."""
     
+    # Field name -> regex with exactly one capture group, used by parse_fields
+    FIELD_SPEC: Dict[str, str] = {}
+    
+    # Fields worded identically in every format; merged into each FIELD_SPEC
+    COMMON_FIELD_SPEC: Dict[str, str] = {
+        "remarks": r"[Rr]emarks?\s*:?\s*([^\n]+)",
+    }
+    
     @abstractmethod
-    def parse(self, text: str, filename: str) -> Dict:
+    def parse(self, text: str, filename: str, text_lower: Optional[str] = None) -> Dict:
         """Parse invoice text and return extracted data."""
         pass
     
-    def extract_field(self, text: str, pattern: str, group: int = 1) -> Optional[str]:
+    def extract_field(
+        self,
+        text: str,
+        pattern: Union[str, re.Pattern],
+        group: int = 1,
+        flags: int = FIELD_FLAGS
+    ) -> Optional[str]:
         """
         Extract a field value using regex pattern.
         
         Args:
             text: Text to search in
-            pattern: Regex pattern with capture group
+            pattern: Regex pattern with capture group, as a string or already compiled
             group: Which capture group to return (default 1)
+            flags: re flags to compile a string pattern with (ignored for compiled ones)
             
         Returns:
             Extracted value or None
         """
-        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE | re.DOTALL)
+        if not isinstance(pattern, re.Pattern):
+            pattern = _compiled(pattern, flags)
+        match = pattern.search(text)
         if match:
             return match.group(group).strip()
         return None
     
+    def parse_fields(self, text: str, spec: Dict[str, str]) -> Dict[str, str]:
+        """
+        Extract all fields declared in a field spec.
+        
+        Args:
+            text: Text to search in
+            spec: Field name -> regex pattern with one capture group
+            
+        Returns:
+            Field name -> first matched value (stripped); missing fields are absent
+        """
+        result = {}
+        for name, pattern in _compiled_spec(tuple(spec.items())):
+            match = pattern.search(text)
+            if match:
+                result[name] = match.group(1).strip()
+        return result
+    
+    def search_anchored(
+        self,
+        pattern: re.Pattern,
+        text: str,
+        text_lower: str,
+        *anchors: str
+    ) -> Optional[re.Match]:
+        """
+        Search only where a pattern can start, instead of over the whole text.
+        
+        Tries pattern.match() within TABLE_WINDOW characters of each occurrence
+        of its leading word, in text order, so the leftmost match wins just as
+        with pattern.search().
+        
+        Args:
+            pattern: Compiled pattern that starts with one of the anchors
+            text: Text to search in
+            text_lower: text.lower(), computed once per parse
+            anchors: Lowercase words the pattern can start with
+            
+        Returns:
+            First match, or None
+        """
+        if len(text_lower) != len(text):
+            # Lowercasing changed offsets (rare non-ASCII), scan normally
+            return pattern.search(text)
+        
+        positions = []
+        for anchor in anchors:
+            pos = text_lower.find(anchor)
+            while pos != -1:
+                positions.append(pos)
+                pos = text_lower.find(anchor, pos + 1)
+        
+        for pos in sorted(positions):
+            match = pattern.match(text, pos, pos + TABLE_WINDOW)
+            if match:
+                return match
+        return None
+    
+    def clean_remarks(self, remarks: Optional[str]) -> str:
+        """
+        Normalize an extracted remarks value.
+        
+        Args:
+            remarks: Raw remarks text (e.g., "Bulk SMS Service - Nov billing")
+            
+        Returns:
+            Uppercased remarks without the "Bulk SMS Service -" prefix, or ""
+        """
+        if not remarks:
+            return ""
+        return BULK_PREFIX_RE.sub('', remarks).strip().upper()
+    
     def clean_amount(self, value: Optional[str]) -> str:
         """Remove commas from amount strings."""
         if value:
@@ -97,6 +259,26 @@ class BaseParser(ABC):
         if not date_str:
             return ""
         
+        stripped = date_str.strip()
+        
+        # Fast path: classify the common shapes and build the string directly
+        formatted = None
+        match = _NUMERIC_DATE_RE.match(stripped)
+        if match:
+            formatted = _format_dmy(match.group(1), match.group(3), match.group(4))
+        else:
+            match = _MONTH_NAME_DATE_RE.match(stripped)
+            if match:
+                month = MONTHS.get(match.group(2).lower())
+                if month:
+                    formatted = _format_dmy(match.group(1), month, match.group(3))
+            else:
+                match = _ISO_DATE_RE.match(stripped)
+                if match:
+                    formatted = _format_dmy(match.group(3), match.group(2), match.group(1))
+        if formatted:
+            return formatted
+        
         # Try various date formats
         formats = [
             "%d.%m.%Y",      # 12.12.2025
@@ -109,7 +291,7 @@ class BaseParser(ABC):
         
         for fmt in formats:
             try:
-                dt = datetime.strptime(date_str.strip(), fmt)
+                dt = datetime.strptime(stripped, fmt)
                 return dt.strftime("%d/%m/%Y")
             except ValueError:
                 continue
@@ -130,19 +312,14 @@ class BaseParser(ABC):
         if not period_str:
             return "", "", ""
         
-        # Common date separators
-        separators = [" - ", " to ", "-", "–"]
-        
         from_date = ""
         to_date = ""
         
-        for sep in separators:
-            if sep in period_str:
-                parts = period_str.split(sep, 1)
-                if len(parts) == 2:
-                    from_date = self.format_date(parts[0].strip())
-                    to_date = self.format_date(parts[1].strip())
-                    break
+        match = _PERIOD_SPLIT_RE.match(period_str)
+        if match:
+            start, end = (part for part in match.groups() if part is not None)
+            from_date = self.format_date(start.strip())
+            to_date = self.format_date(end.strip())
         
         # Calculate billing frequency
         billing_frequency = self.calculate_billing_frequency(from_date, to_date)
@@ -168,11 +345,10 @@ class BaseParser(ABC):
             end = datetime.strptime(to_date, "%d/%m/%Y")
             
             # Calculate difference in months
-            rdelta = relativedelta(end, start)
-            total_months = rdelta.years * 12 + rdelta.months
+            total_months = (end.year - start.year) * 12 + (end.month - start.month)
             
             # Add 1 because period is inclusive
-            if rdelta.days > 0:
+            if end.day > start.day:
                 total_months += 1
             
             if total_months <= 1:
@@ -225,16 +401,16 @@ class BaseParser(ABC):
         Returns:
             State name (e.g., "Maharashtra")
         """
-        if not gst_number or len(gst_number) < 2:
-            return ""
-        
-        state_code = gst_number[:2]
-        return GST_STATE_CODES.get(state_code, "")
+        return _state_from_gst(gst_number)
     
-    def extract_gst_state(self, place_of_supply: Optional[str], gst_number: Optional[str] = None) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def extract_gst_state(place_of_supply: Optional[str], gst_number: Optional[str] = None) -> str:
         """
         Extract state name from place of supply or GST number.
         
+        Cached because the same vendor GST/place of supply repeats across a batch.
+        
         Args:
             place_of_supply: String like "06 Haryana" or "Maharashtra,27"
             gst_number: GST number to extract state code from
@@ -242,19 +418,18 @@ class BaseParser(ABC):
         Returns:
             State name only (without code)
         """
-        # First try to get from GST number
-        if gst_number and len(gst_number) >= 2:
-            state = self.get_state_from_gst(gst_number)
-            if state:
-                return state
+        # First try to get from GST number (state code = first 2 characters)
+        state = _state_from_gst(gst_number)
+        if state:
+            return state
         
         # Fallback to place of supply parsing
         if not place_of_supply:
             return ""
         
         # Remove state code (first 2 digits) if present
-        cleaned = re.sub(r'^\d{2}\s*', '', place_of_supply.strip())
+        cleaned = _STATE_PREFIX_RE.sub('', place_of_supply.strip())
         # Remove trailing numbers/commas
-        cleaned = re.sub(r'[,\s]*\d+$', '', cleaned)
+        cleaned = _STATE_SUFFIX_RE.sub('', cleaned)
         
         return cleaned.strip()
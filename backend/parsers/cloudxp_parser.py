@@ -5,75 +5,88 @@ This handles 95% of invoices
 """
 
 import re
-from typing import Dict
-from .base_parser import BaseParser
+from typing import Dict, Optional
+from .base_parser import BaseParser, FIELD_FLAGS
+
+
+# Particulars table rows; description and figures sit on separate lines
+# (handles both "SMS Service" and "Bulk SMS")
+_DELIVERED_RE = re.compile(
+    r"Delivered\s+Segment\s+Charges?\s+\d+\s+(?:SMS\s+Service|Bulk\s+SMS)\s+(\d+)\s+([\d,]+(?:\.\d+)?)\s+([\d.]+)\s+([\d,]+(?:\.\d+)?)",
+    re.IGNORECASE
+)
+_SUBMITTED_RE = re.compile(
+    r"Submitted\s+Segment\s+DLT\s+\d+\s+(?:SMS\s+Service|Bulk\s+SMS)\s+(\d+)\s+([\d,]+(?:\.\d+)?)\s+([\d.]+)\s+([\d,]+(?:\.\d+)?)",
+    re.IGNORECASE
+)
+# Two-column "Total Amount" layout: take the second figure
+_AMOUNT_FALLBACK_RE = re.compile(
+    r"Total\s*Amount\s+[\d,]+\.?\d*\s+([\d,]+\.?\d*)",
+    FIELD_FLAGS
+)
 
 
 class CloudXPParser(BaseParser):
     """Parser for CloudXP format invoices (Jio branded)."""
     
-    def parse(self, text: str, filename: str) -> Dict:
+    FIELD_SPEC = {
+        "invoice_no": r"Invoice\s*Number\s*:?\s*([A-Z0-9]+)",
+        "invoice_date": r"Invoice\s*Date\s*:?\s*(\d{1,2}[-./]\w{3}[-./]\d{4}|\d{1,2}[-./]\d{1,2}[-./]\d{4})",
+        "gst_registration": r"GST\s*Registration\s*Number\s*:?\s*([A-Z0-9]+)",
+        # Billed To (Party/Customer)
+        "party_customer": r"Billed\s*To\s*:?\s*([^\n]+)",
+        # Full PO including spaces and numbers like "ASL/ 5500546061"
+        "order_no": r"PO\s*Number\s*:?\s*([A-Z0-9/\s]+?)(?:\s*PO\s*Date|\s*\n|$)",
+        "order_date": r"PO\s*Date\s*:?\s*(\d{1,2}[-./]\w{3}[-./]\d{4}|\d{1,2}[-./]\d{1,2}[-./]\d{4})",
+        "invoice_period": r"Invoice\s*Period\s*:?\s*(\d{1,2}[-./]\w{3,}[-./]\d{4}\s*(?:to|-)\s*\d{1,2}[-./]\w{3,}[-./]\d{4})",
+        # Total Amount (before tax)
+        "amount": r"Total\s*Amount\s*:?\s*([\d,]+\.?\d*)",
+        # CGST / SGST from Tax Breakup
+        "cgst": r"CGST\s*@?\s*\d+%?\s+([\d,]+\.?\d*)",
+        "sgst": r"SGST\s*@?\s*\d+%?\s+([\d,]+\.?\d*)",
+        # Grand Total (with tax)
+        "total_amount": r"Grand\s*Total\s*\(?\s*Including\s*Tax\s*\)?\s*:?\s*([\d,]+\.?\d*)",
+        # Fields shared by every format (remarks)
+        **BaseParser.COMMON_FIELD_SPEC,
+    }
+    
+    def parse(self, text: str, filename: str, text_lower: Optional[str] = None) -> Dict:
         """
         Parse CloudXP invoice and extract all required fields.
         
         Args:
             text: Extracted text from PDF
             filename: Original filename for reference
+            text_lower: text.lower() if the caller already has it
             
         Returns:
             Dictionary with all 21 Tally fields
         """
-        # Extract Invoice Number
-        invoice_no = self.extract_field(
-            text, 
-            r"Invoice\s*Number\s*:?\s*([A-Z0-9]+)"
-        )
-        
-        # Extract Invoice Date
-        invoice_date_raw = self.extract_field(
-            text,
-            r"Invoice\s*Date\s*:?\s*(\d{1,2}[-./]\w{3}[-./]\d{4}|\d{1,2}[-./]\d{1,2}[-./]\d{4})"
-        )
+        fields = self.parse_fields(text, self.FIELD_SPEC)
+        
+        invoice_no = fields.get("invoice_no")
+        
+        invoice_date_raw = fields.get("invoice_date")
         invoice_date = self.format_date(invoice_date_raw) if invoice_date_raw else ""
         
-        # Extract GST Registration Number
-        gst_registration = self.extract_field(
-            text,
-            r"GST\s*Registration\s*Number\s*:?\s*([A-Z0-9]+)"
-        )
+        gst_registration = fields.get("gst_registration")
         
         # Extract GST State from GST number (first 2 digits)
         gst_state = self.get_state_from_gst(gst_registration)
         
-        # Extract Billed To (Party/Customer)
-        party_customer = self.extract_field(
-            text,
-            r"Billed\s*To\s*:?\s*([^\n]+)"
-        )
+        party_customer = fields.get("party_customer")
         if party_customer:
             # Clean up - take only company name (first line)
             party_customer = party_customer.split("\n")[0].strip()
         
-        # Extract PO Number (capture full PO including spaces and numbers like "ASL/ 5500546061")
-        order_no = self.extract_field(
-            text,
-            r"PO\s*Number\s*:?\s*([A-Z0-9/\s]+?)(?:\s*PO\s*Date|\s*\n|$)"
-        )
+        order_no = fields.get("order_no")
         if order_no:
             order_no = order_no.strip()
         
-        # Extract PO Date
-        order_date_raw = self.extract_field(
-            text,
-            r"PO\s*Date\s*:?\s*(\d{1,2}[-./]\w{3}[-./]\d{4}|\d{1,2}[-./]\d{1,2}[-./]\d{4})"
-        )
+        order_date_raw = fields.get("order_date")
         order_date = self.format_date(order_date_raw) if order_date_raw else ""
         
-        # Extract Invoice Period
-        invoice_period = self.extract_field(
-            text,
-            r"Invoice\s*Period\s*:?\s*(\d{1,2}[-./]\w{3,}[-./]\d{4}\s*(?:to|-)\s*\d{1,2}[-./]\w{3,}[-./]\d{4})"
-        )
+        invoice_period = fields.get("invoice_period")
         period_from, period_to, billing_frequency = self.parse_invoice_period(invoice_period)
         
         # Generate Ledger Name with new format (Oct-25 to Dec-25)
@@ -88,11 +101,9 @@ class CloudXPParser(BaseParser):
         # Charges
         
         # Delivered Segment Charges - match across newlines (handles both "SMS Service" and "Bulk SMS")
-        delivered_match = re.search(
-            r"Delivered\s+Segment\s+Charges?\s*\n\s*\d+\s+(?:SMS\s+Service|Bulk\s+SMS)\s+(\d+)\s+([\d,]+\.?\d*)\s+([\d.]+)\s+([\d,]+\.?\d*)",
-            text,
-            re.IGNORECASE
-        )
+        if text_lower is None:
+            text_lower = text.lower()
+        delivered_match = self.search_anchored(_DELIVERED_RE, text, text_lower, "delivered")
         
         delivered_qty = ""
         delivered_rate = ""
@@ -102,11 +113,7 @@ class CloudXPParser(BaseParser):
             delivered_rate = delivered_match.group(3)
         
         # Submitted Segment DLT Charges - match across newlines (handles both "SMS Service" and "Bulk SMS")
-        submitted_match = re.search(
-            r"Submitted\s+Segment\s+DLT\s*\n\s*\d+\s+(?:SMS\s+Service|Bulk\s+SMS)\s+(\d+)\s+([\d,]+\.?\d*)\s+([\d.]+)\s+([\d,]+\.?\d*)",
-            text,
-            re.IGNORECASE
-        )
+        submitted_match = self.search_anchored(_SUBMITTED_RE, text, text_lower, "submitted")
         
         submitted_qty = ""
         submitted_rate = ""
@@ -117,48 +124,19 @@ class CloudXPParser(BaseParser):
             submitted_rate = submitted_match.group(3)
             dlt_qty = submitted_qty  # DLT qty is same as submitted
         
-        # Extract Total Amount (before tax)
-        amount = self.extract_field(
-            text,
-            r"Total\s*Amount\s*:?\s*([\d,]+\.?\d*)"
-        )
+        # Total Amount (before tax), falling back to the two-column layout
+        amount = fields.get("amount")
         if not amount:
-            amount = self.extract_field(
-                text,
-                r"Total\s*Amount\s+[\d,]+\.?\d*\s+([\d,]+\.?\d*)"
-            )
+            fallback_match = _AMOUNT_FALLBACK_RE.search(text)
+            amount = fallback_match.group(1).strip() if fallback_match else None
         amount = self.clean_amount(amount)
         
-        # Extract CGST from Tax Breakup
-        cgst = self.extract_field(
-            text,
-            r"CGST\s*@?\s*\d+%?\s+([\d,]+\.?\d*)"
-        )
-        cgst = self.clean_amount(cgst)
-        
-        # Extract SGST from Tax Breakup
-        sgst = self.extract_field(
-            text,
-            r"SGST\s*@?\s*\d+%?\s+([\d,]+\.?\d*)"
-        )
-        sgst = self.clean_amount(sgst)
-        
-        # Extract Grand Total (with tax)
-        total_amount = self.extract_field(
-            text,
-            r"Grand\s*Total\s*\(?\s*Including\s*Tax\s*\)?\s*:?\s*([\d,]+\.?\d*)"
-        )
-        total_amount = self.clean_amount(total_amount)
-        
-        # Extract Remarks and clean up
-        remarks = self.extract_field(
-            text,
-            r"[Rr]emarks?\s*:?\s*([^\n]+)"
-        )
-        if remarks:
-            # Remove "Bulk SMS Service -" prefix if present
-            remarks = re.sub(r'^Bulk\s*SMS\s*Service\s*[-:]\s*', '', remarks, flags=re.IGNORECASE)
-            remarks = remarks.strip().upper()
+        cgst = self.clean_amount(fields.get("cgst"))
+        sgst = self.clean_amount(fields.get("sgst"))
+        total_amount = self.clean_amount(fields.get("total_amount"))
+        
+        # Clean up remarks
+        remarks = self.clean_remarks(fields.get("remarks"))
         
         return {
             "invoice_no": invoice_no or "",
@@ -183,5 +161,5 @@ class CloudXPParser(BaseParser):
             "cgst": cgst,
             "sgst": sgst,
             "total_amount": total_amount,
-            "remarks": remarks or ""
+            "remarks": remarks
         }
@@ -4,42 +4,69 @@ Parses Jio Things Limited invoices with "TAX INVOICE" header (no branding)
 """
 
 import re
-from typing import Dict
+from typing import Dict, Optional
 from .base_parser import BaseParser
 
 
+# "Recipient <NAME>" but not "Recipient No", ending before the next field
+_RECIPIENT_RE = re.compile(
+    r"Recipient\s+(?!No)([A-Z][A-Z0-9\s&\-\.]+?)(?:\s+Date|\s+\d{1,2}[./]|\s+Invoice|\s*\n|\s+6-A|$)",
+    re.IGNORECASE | re.MULTILINE
+)
+_RECIPIENT_LINE_START_RE = re.compile(r'^\s*Recipient\s+(?!No)', re.IGNORECASE)
+_RECIPIENT_NAME_RE = re.compile(r'Recipient\s+([A-Z][A-Z0-9\s&\-\.]+)', re.IGNORECASE)
+# SMS # SCRUBBING / DLT COUNT row (Submitted Qty)
+_DLT_RE = re.compile(
+    r"(?:SMS\s*#?\s*SCRUBBING|DLT\s*COUNT)\s+(\d+)\s+([\d,]+(?:\.\d+)?)\s+([\d.]+)\s+([\d,]+(?:\.\d+)?)",
+    re.IGNORECASE
+)
+# BSS SERVICE CHARGE row (Delivered Qty)
+_BSS_RE = re.compile(
+    r"BSS\s*SERVICE\s*CHARGE\s+(\d+)\s+([\d,]+(?:\.\d+)?)\s+([\d.]+)\s+([\d,]+(?:\.\d+)?)",
+    re.IGNORECASE
+)
+
+
 class JTLParser(BaseParser):
     """Parser for JTL (Jio Things Limited) format invoices."""
     
-    def parse(self, text: str, filename: str) -> Dict:
+    FIELD_SPEC = {
+        "invoice_no": r"Invoice\s*No\.?\s*:?\s*([A-Z0-9]+)",
+        "invoice_date": r"Date\s*:?\s*(\d{1,2}[./]\d{1,2}[./]\d{4})",
+        # Supplier's GSTIN
+        "gst_registration": r"GSTIN\s+([A-Z0-9]{15})",
+        # ORN (Order Reference Number) - JTL's PO equivalent
+        "order_no": r"ORN\s*:?\s*(\d+)",
+        "invoice_period": r"Invoice\s*Period\s*:?\s*(\d{1,2}[./]\d{1,2}[./]\d{4}\s*[-–]\s*\d{1,2}[./]\d{1,2}[./]\d{4})",
+        # Total Taxable Value (Amount before tax)
+        "amount": r"Total\s*Taxable\s*value\s*([\d,]+\.?\d*)",
+        "cgst": r"CGST\s*@?\s*\d+\s*%?\s*([\d,]+\.?\d*)",
+        "sgst": r"SGST\s*@?\s*\d+\s*%?\s*([\d,]+\.?\d*)",
+        "total_amount": r"Total\s*\(\s*Value\s*is\s*inclusive\s*of\s*Tax\s*\)\s*([\d,]+\.?\d*)",
+        # Fields shared by every format (remarks)
+        **BaseParser.COMMON_FIELD_SPEC,
+    }
+    
+    def parse(self, text: str, filename: str, text_lower: Optional[str] = None) -> Dict:
         """
         Parse JTL invoice and extract all required fields.
         
         Args:
             text: Extracted text from PDF
             filename: Original filename for reference
+            text_lower: text.lower() if the caller already has it
             
         Returns:
             Dictionary with all 21 Tally fields + remarks
         """
-        # Extract Invoice Number
-        invoice_no = self.extract_field(
-            text,
-            r"Invoice\s*No\.?\s*:?\s*([A-Z0-9]+)"
-        )
-        
-        # Extract Invoice Date
-        invoice_date_raw = self.extract_field(
-            text,
-            r"Date\s*:?\s*(\d{1,2}[./]\d{1,2}[./]\d{4})"
-        )
+        fields = self.parse_fields(text, self.FIELD_SPEC)
+        
+        invoice_no = fields.get("invoice_no")
+        
+        invoice_date_raw = fields.get("invoice_date")
         invoice_date = self.format_date(invoice_date_raw) if invoice_date_raw else ""
         
-        # Extract GSTIN (Supplier's)
-        gst_registration = self.extract_field(
-            text,
-            r"GSTIN\s+([A-Z0-9]{15})"
-        )
+        gst_registration = fields.get("gst_registration")
         
         # Extract GST State from GST number
         gst_state = self.get_state_from_gst(gst_registration)
@@ -53,11 +80,7 @@ class JTLParser(BaseParser):
         
         # Look for "Recipient" followed by name (not "Recipient No")
         # Pattern: "Recipient" followed by whitespace and the company name
-        recipient_match = re.search(
-            r"Recipient\s+(?!No)([A-Z][A-Z0-9\s&\-\.]+?)(?:\s+Date|\s+\d{1,2}[./]|\s+Invoice|\s*\n|\s+6-A|$)",
-            text,
-            re.IGNORECASE | re.MULTILINE
-        )
+        recipient_match = _RECIPIENT_RE.search(text)
         if recipient_match:
             party_customer = recipient_match.group(1).strip()
         
@@ -66,9 +89,9 @@ class JTLParser(BaseParser):
             lines = text.split('\n')
             for line in lines:
                 # Match line that starts with "Recipient" but NOT "Recipient No"
-                if re.match(r'^\s*Recipient\s+(?!No)', line, re.IGNORECASE):
+                if _RECIPIENT_LINE_START_RE.match(line):
                     # Extract the name part
-                    match = re.search(r'Recipient\s+([A-Z][A-Z0-9\s&\-\.]+)', line, re.IGNORECASE)
+                    match = _RECIPIENT_NAME_RE.search(line)
                     if match:
                         party_customer = match.group(1).strip()
                         # Clean up - remove trailing address parts
@@ -76,31 +99,21 @@ class JTLParser(BaseParser):
                             party_customer = party_customer.split(',')[0].strip()
                         break
         
-        # Extract ORN (Order Reference Number) - JTL's PO equivalent
-        order_no = self.extract_field(
-            text,
-            r"ORN\s*:?\s*(\d+)"
-        )
+        order_no = fields.get("order_no")
         
         # JTL invoices don't have Order Date
         order_date = ""
         
-        # Extract Invoice Period
-        invoice_period = self.extract_field(
-            text,
-            r"Invoice\s*Period\s*:?\s*(\d{1,2}[./]\d{1,2}[./]\d{4}\s*[-–]\s*\d{1,2}[./]\d{1,2}[./]\d{4})"
-        )
+        invoice_period = fields.get("invoice_period")
         period_from, period_to, billing_frequency = self.parse_invoice_period(invoice_period)
         
         # Generate Ledger Name with new format
         ledger_name = self.generate_ledger_name(period_from, period_to)
         
         # Extract SMS # SCRUBBING/ DLT COUNT (Submitted Qty)
-        dlt_match = re.search(
-            r"(?:SMS\s*#?\s*SCRUBBING|DLT\s*COUNT)\s+(\d+)\s+([\d,]+\.?\d*)\s+([\d.]+)\s+([\d,]+\.?\d*)",
-            text,
-            re.IGNORECASE
-        )
+        if text_lower is None:
+            text_lower = text.lower()
+        dlt_match = self.search_anchored(_DLT_RE, text, text_lower, "sms", "dlt")
         
         submitted_qty = ""
         submitted_rate = ""
@@ -112,11 +125,7 @@ class JTLParser(BaseParser):
             dlt_qty = submitted_qty
 
         # Extract BSS SERVICE CHARGE (Delivered Qty)
-        bss_match = re.search(
-            r"BSS\s*SERVICE\s*CHARGE\s+(\d+)\s+([\d,]+\.?\d*)\s+([\d.]+)\s+([\d,]+\.?\d*)",
-            text,
-            re.IGNORECASE
-        )
+        bss_match = self.search_anchored(_BSS_RE, text, text_lower, "bss")
 
         delivered_qty = ""
         delivered_rate = ""
@@ -124,43 +133,19 @@ class JTLParser(BaseParser):
             delivered_qty = bss_match.group(2).replace(",", "").split(".")[0]
             delivered_rate = bss_match.group(3)
         
-        # Extract Total Taxable Value (Amount before tax)
-        amount = self.extract_field(
-            text,
-            r"Total\s*Taxable\s*value\s*([\d,]+\.?\d*)"
-        )
+        amount = fields.get("amount")
         amount = self.clean_amount(amount)
         
-        # Extract CGST
-        cgst = self.extract_field(
-            text,
-            r"CGST\s*@?\s*\d+\s*%?\s*([\d,]+\.?\d*)"
-        )
+        cgst = fields.get("cgst")
         cgst = self.clean_amount(cgst)
         
-        # Extract SGST
-        sgst = self.extract_field(
-            text,
-            r"SGST\s*@?\s*\d+\s*%?\s*([\d,]+\.?\d*)"
-        )
+        sgst = fields.get("sgst")
         sgst = self.clean_amount(sgst)
         
-        # Extract Total (Value is inclusive of Tax)
-        total_amount = self.extract_field(
-            text,
-            r"Total\s*\(\s*Value\s*is\s*inclusive\s*of\s*Tax\s*\)\s*([\d,]+\.?\d*)"
-        )
+        total_amount = fields.get("total_amount")
         total_amount = self.clean_amount(total_amount)
         
-        # Extract Remarks and clean up
-        remarks = self.extract_field(
-            text,
-            r"[Rr]emarks?\s*:?\s*([^\n]+)"
-        )
-        if remarks:
-            # Remove "Bulk SMS Service -" prefix if present
-            remarks = re.sub(r'^Bulk\s*SMS\s*Service\s*[-:]\s*', '', remarks, flags=re.IGNORECASE)
-            remarks = remarks.strip().upper()
+        remarks = self.clean_remarks(fields.get("remarks"))
         
         return {
             "invoice_no": invoice_no or "",
@@ -185,5 +170,5 @@ class JTLParser(BaseParser):
             "cgst": cgst,
             "sgst": sgst,
             "total_amount": total_amount,
-            "remarks": remarks or ""
+            "remarks": remarks
         }
@@ -4,42 +4,61 @@ Parses Reliance Jio Infocomm Limited invoices with "ORIGINAL FOR RECIPIENT Tax I
 """
 
 import re
-from typing import Dict
+from typing import Dict, Optional
 from .base_parser import BaseParser
 
 
+# Header phrases that mark a "Recipient" line as the title, not the party
+_HEADER_SKIP = ("FOR RECIPIENT", "TAX INVOICE")
+# "Recipient <NAME>" on a single line
+_RECIPIENT_LINE_RE = re.compile(r"Recipient\s+([A-Z][A-Z0-9\s]+)", re.IGNORECASE)
+# Fallback: company name ending with LIMITED/LTD anywhere in the text
+_RECIPIENT_COMPANY_RE = re.compile(r"Recipient\s+([A-Z][A-Z0-9\s]+(?:LIMITED|LTD))", re.IGNORECASE)
+# RJIL only has BULK SMS, no separate DLT/Submitted rows
+_BULK_SMS_RE = re.compile(r"BULK\s*SMS\s+(\d+)\s+([\d,]+)\s+EA\s+([\d.]+)\s+([\d,]+(?:\.\d+)?)", re.IGNORECASE)
+
+
 class RJILParser(BaseParser):
     """Parser for RJIL format invoices."""
     
-    def parse(self, text: str, filename: str) -> Dict:
+    FIELD_SPEC = {
+        "invoice_no": r"Invoice\s*no\.?\s*:?\s*(\d+)",
+        "invoice_date": r"Invoice\s*date\s*:?\s*(\d{1,2}[./]\d{1,2}[./]\d{4})",
+        # Supplier's GSTIN
+        "gst_registration": r"GSTIN\s+([A-Z0-9]{15})",
+        # Format: "PO No. 2526NSCCLIT94" or "PO No . 2526NSCCLIT94"
+        "order_no": r"PO\s*No\s*\.?\s*:?\s*([A-Z0-9]+)",
+        "order_date": r"PO\s*Date\.?\s*:?\s*(\d{1,2}[./]\d{1,2}[./]\d{4})",
+        "invoice_period": r"Invoice\s*period\s*:?\s*(\d{1,2}[./]\d{1,2}[./]\d{4}\s*[-–]\s*\d{1,2}[./]\d{1,2}[./]\d{4})",
+        "amount": r"Total\s*Amount\s*Excluding\s*Taxes\s*([\d,]+\.?\d*)",
+        # CGST / SGST from Tax Payable section
+        "cgst": r"CGST\s+[\d.]+\s*%?\s*([\d,]+\.?\d*)",
+        "sgst": r"SGST\s+[\d.]+\s*%?\s*([\d,]+\.?\d*)",
+        "total_amount": r"Grand\s*Total\s*\(?\s*Including\s*GST\s*\)?\s*([\d,]+\.?\d*)",
+        # Fields shared by every format (remarks)
+        **BaseParser.COMMON_FIELD_SPEC,
+    }
+    
+    def parse(self, text: str, filename: str, text_lower: Optional[str] = None) -> Dict:
         """
         Parse RJIL invoice and extract all required fields.
         
         Args:
             text: Extracted text from PDF
             filename: Original filename for reference
+            text_lower: text.lower() if the caller already has it
             
         Returns:
             Dictionary with all 21 Tally fields
         """
-        # Extract Invoice Number
-        invoice_no = self.extract_field(
-            text,
-            r"Invoice\s*no\.?\s*:?\s*(\d+)"
-        )
-        
-        # Extract Invoice Date
-        invoice_date_raw = self.extract_field(
-            text,
-            r"Invoice\s*date\s*:?\s*(\d{1,2}[./]\d{1,2}[./]\d{4})"
-        )
+        fields = self.parse_fields(text, self.FIELD_SPEC)
+        
+        invoice_no = fields.get("invoice_no")
+        
+        invoice_date_raw = fields.get("invoice_date")
         invoice_date = self.format_date(invoice_date_raw) if invoice_date_raw else ""
         
-        # Extract GSTIN (Supplier's GST)
-        gst_registration = self.extract_field(
-            text,
-            r"GSTIN\s+([A-Z0-9]{15})"
-        )
+        gst_registration = fields.get("gst_registration")
         
         # Extract GST State from GST number
         gst_state = self.get_state_from_gst(gst_registration)
@@ -50,19 +69,21 @@ class RJILParser(BaseParser):
         party_customer = None
         
         # Method: Parse line by line to find "Recipient" that is NOT part of header
-        lines = text.split('\n')
-        for line in lines:
-            line_stripped = line.strip()
-            # Skip header lines containing "FOR RECIPIENT" or "Tax Invoice"
-            if "FOR RECIPIENT" in line_stripped.upper():
-                continue
-            if "TAX INVOICE" in line_stripped.upper() and "RECIPIENT" in line_stripped.upper():
+        for line in text.split('\n'):
+            # Cheap C-level reject for the vast majority of lines
+            if "Recipient" not in line:
                 continue
+            line_stripped = line.strip()
             
             # Look for line starting with "Recipient" followed by company name
             if line_stripped.startswith("Recipient"):
+                # Skip header lines containing "FOR RECIPIENT" or "Tax Invoice"
+                line_upper = line_stripped.upper()
+                if any(header in line_upper for header in _HEADER_SKIP):
+                    continue
+                
                 # Extract the text after "Recipient"
-                match = re.search(r"Recipient\s+([A-Z][A-Z0-9\s]+)", line_stripped, re.IGNORECASE)
+                match = _RECIPIENT_LINE_RE.search(line_stripped)
                 if match:
                     name = match.group(1).strip()
                     # Skip if it's "Tax Invoice"
@@ -75,45 +96,27 @@ class RJILParser(BaseParser):
         
         # Fallback: Try to find company name ending with LIMITED/LTD
         if not party_customer:
-            recipient_match = re.search(
-                r"Recipient\s+([A-Z][A-Z0-9\s]+(?:LIMITED|LTD))",
-                text,
-                re.IGNORECASE
-            )
+            recipient_match = _RECIPIENT_COMPANY_RE.search(text)
             if recipient_match:
                 name = recipient_match.group(1).strip()
                 if name.upper() not in ["TAX INVOICE", "TAX", "INVOICE"]:
                     party_customer = name
         
-        # Extract PO Number (format: "PO No. 2526NSCCLIT94" or "PO No . 2526NSCCLIT94")
-        order_no = self.extract_field(
-            text,
-            r"PO\s*No\s*\.?\s*:?\s*([A-Z0-9]+)"
-        )
-        
-        # Extract PO Date
-        order_date_raw = self.extract_field(
-            text,
-            r"PO\s*Date\.?\s*:?\s*(\d{1,2}[./]\d{1,2}[./]\d{4})"
-        )
+        order_no = fields.get("order_no")
+        
+        order_date_raw = fields.get("order_date")
         order_date = self.format_date(order_date_raw) if order_date_raw else ""
         
-        # Extract Invoice Period
-        invoice_period = self.extract_field(
-            text,
-            r"Invoice\s*period\s*:?\s*(\d{1,2}[./]\d{1,2}[./]\d{4}\s*[-–]\s*\d{1,2}[./]\d{1,2}[./]\d{4})"
-        )
+        invoice_period = fields.get("invoice_period")
         period_from, period_to, billing_frequency = self.parse_invoice_period(invoice_period)
         
         # Generate Ledger Name with new format
         ledger_name = self.generate_ledger_name(period_from, period_to)
         
         # Extract BULK SMS quantity (RJIL only has BULK SMS, no separate DLT/Submitted)
-        bulk_sms_match = re.search(
-            r"BULK\s*SMS\s+(\d+)\s+([\d,]+)\s+EA\s+([\d.]+)\s+([\d,]+\.?\d*)",
-            text,
-            re.IGNORECASE
-        )
+        if text_lower is None:
+            text_lower = text.lower()
+        bulk_sms_match = self.search_anchored(_BULK_SMS_RE, text, text_lower, "bulk")
         
         delivered_qty = ""
         submitted_qty = ""
@@ -122,43 +125,19 @@ class RJILParser(BaseParser):
         if bulk_sms_match:
             delivered_qty = bulk_sms_match.group(2).replace(",", "")
         
-        # Extract Total Amount Excluding Taxes
-        amount = self.extract_field(
-            text,
-            r"Total\s*Amount\s*Excluding\s*Taxes\s*([\d,]+\.?\d*)"
-        )
+        amount = fields.get("amount")
         amount = self.clean_amount(amount)
         
-        # Extract CGST from Tax Payable section
-        cgst = self.extract_field(
-            text,
-            r"CGST\s+[\d.]+\s*%?\s*([\d,]+\.?\d*)"
-        )
+        cgst = fields.get("cgst")
         cgst = self.clean_amount(cgst)
         
-        # Extract SGST from Tax Payable section
-        sgst = self.extract_field(
-            text,
-            r"SGST\s+[\d.]+\s*%?\s*([\d,]+\.?\d*)"
-        )
+        sgst = fields.get("sgst")
         sgst = self.clean_amount(sgst)
         
-        # Extract Grand Total (Including GST)
-        total_amount = self.extract_field(
-            text,
-            r"Grand\s*Total\s*\(?\s*Including\s*GST\s*\)?\s*([\d,]+\.?\d*)"
-        )
+        total_amount = fields.get("total_amount")
         total_amount = self.clean_amount(total_amount)
         
-        # Extract Remarks and clean up
-        remarks = self.extract_field(
-            text,
-            r"[Rr]emarks?\s*:?\s*([^\n]+)"
-        )
-        if remarks:
-            # Remove "Bulk SMS Service -" prefix if present
-            remarks = re.sub(r'^Bulk\s*SMS\s*Service\s*[-:]\s*', '', remarks, flags=re.IGNORECASE)
-            remarks = remarks.strip().upper()
+        remarks = self.clean_remarks(fields.get("remarks"))
         
         return {
             "invoice_no": invoice_no or "",
@@ -183,5 +162,5 @@ class RJILParser(BaseParser):
             "cgst": cgst,
             "sgst": sgst,
             "total_amount": total_amount,
-            "remarks": remarks or ""
+            "remarks": remarks
         }
@@ -3,40 +3,63 @@ Invoice Type Detection Service
 Identifies whether an invoice is CloudXP, RJIL, or JTL based on header patterns
 """
 
-import re
 import logging
+from enum import Enum
+from typing import Optional
 
 logger = logging.getLogger("invoice_extractor")
 
 
-def detect_invoice_type(text: str) -> str:
+class InvoiceType(str, Enum):
+    """Supported invoice formats; members compare equal to their string values."""
+    CLOUDXP = "cloudxp"
+    RJIL = "rjil"
+    JTL = "jtl"
+    UNKNOWN = "unknown"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+# Header marker phrases (lowercase) used to tell invoice formats apart
+CLOUDXP_HEADER = "tax invoice (original)"
+ACCOUNT_NUMBER = "account number"
+RJIL_COMPANY = "reliance jio infocomm limited"
+RJIL_HEADER = "original for recipient"
+JTL_COMPANY = "jio things limited"
+
+
+def detect_invoice_type(text: str, text_lower: Optional[str] = None) -> InvoiceType:
     """
     Detect the type of invoice based on text content.
 
     Args:
         text: Extracted text from PDF
+        text_lower: text.lower() if the caller already has it, so the
+            lowercase copy is shared with the parser instead of rebuilt
 
     Returns:
         Invoice type: 'cloudxp', 'rjil', 'jtl', or 'unknown'
     """
-    text_upper = text.upper()
+    if text_lower is None:
+        text_lower = text.lower()
 
     # Check for CloudXP format (Jio logo + TAX INVOICE (ORIGINAL))
     # CloudXP invoices have "TAX INVOICE (ORIGINAL)" near the top
     # and specific fields like "Account Number:", "Invoice Number:"
-    if "TAX INVOICE (ORIGINAL)" in text_upper and "ACCOUNT NUMBER" in text_upper:
-        return "cloudxp"
+    if CLOUDXP_HEADER in text_lower and ACCOUNT_NUMBER in text_lower:
+        return InvoiceType.CLOUDXP
 
     # Check for RJIL format
     # Has "Reliance Jio Infocomm Limited" and "ORIGINAL FOR RECIPIENT"
-    if "RELIANCE JIO INFOCOMM LIMITED" in text_upper and "ORIGINAL FOR RECIPIENT" in text_upper:
-        return "rjil"
+    if RJIL_COMPANY in text_lower and RJIL_HEADER in text_lower:
+        return InvoiceType.RJIL
 
     # Check for JTL format
     # Has "Jio Things Limited" without the above markers
-    if "JIO THINGS LIMITED" in text_upper:
-        return "jtl"
+    if JTL_COMPANY in text_lower:
+        return InvoiceType.JTL
 
     # Return unknown instead of silently defaulting
     logger.warning("Could not detect invoice type from text content")
-    return "unknown"
+    return InvoiceType.UNKNOWN
@@ -0,0 +1,74 @@
+"""
+Invoice Processing Service
+Runs the extract -> detect -> parse pipeline for a single PDF.
+Kept free of FastAPI imports so it can run inside process pool workers.
+"""
+
+from concurrent.futures import Executor
+from typing import Dict, Optional, Union
+
+from logging_config import logger
+from services.pdf_extractor import extract_text_from_pdf
+from services.invoice_detector import InvoiceType, detect_invoice_type
+from parsers.cloudxp_parser import CloudXPParser
+from parsers.rjil_parser import RJILParser
+from parsers.jtl_parser import JTLParser
+
+
+# Bound parse methods, created once per worker process, not once per call
+parse_by_type = {
+    InvoiceType.CLOUDXP: CloudXPParser().parse,
+    InvoiceType.RJIL: RJILParser().parse,
+    InvoiceType.JTL: JTLParser().parse
+}
+
+
+def process_invoice_file(
+    source: Union[str, bytes],
+    filename: str,
+    page_executor: Optional[Executor] = None,
+    page_workers: Optional[int] = None
+) -> Dict:
+    """
+    Extract, detect and parse a single PDF invoice.
+
+    Args:
+        source: PDF bytes, or path to a PDF saved on disk
+        filename: Original filename for reference
+        page_executor: Optional process pool for extracting pages of long PDFs in parallel
+        page_workers: Number of workers in page_executor
+
+    Returns:
+        Parsed invoice data, or a dict with "filename" and "error" keys
+    """
+    try:
+        # Extract text from PDF
+        text = extract_text_from_pdf(source, page_executor, page_workers)
+
+        if not text.strip():
+            logger.warning("No text extracted from %s", filename)
+            return {"filename": filename, "error": "Could not extract text from PDF"}
+
+        # Lowercase once; shared by detection and the parser's anchored searches
+        text_lower = text.lower()
+
+        # Detect invoice type
+        invoice_type = detect_invoice_type(text, text_lower)
+
+        if invoice_type is InvoiceType.UNKNOWN:
+            logger.warning("Unknown invoice type for %s", filename)
+            return {
+                "filename": filename,
+                "error": "Could not detect invoice type. Supported: CloudXP, RJIL, JTL"
+            }
+
+        # Parse invoice
+        data = parse_by_type[invoice_type](text, filename, text_lower)
+        data["invoice_type"] = invoice_type.value
+        data["filename"] = filename
+        data.setdefault("product", "SMS")
+        return data
+
+    except Exception as e:
+        logger.error("Error processing %s: %s", filename, str(e))
+        return {"filename": filename, "error": str(e)}
@@ -1,30 +1,171 @@
 """
 PDF Text Extraction Service
-Uses pdfplumber for reliable text extraction from PDF invoices
+Uses pypdfium2 (native PDFium) for fast text extraction from PDF invoices
 """
 
-import pdfplumber
+import os
+import re
+import threading
+from concurrent.futures import Executor
+from typing import BinaryIO, List, Optional, Union
 
+import pypdfium2 as pdfium
 
-def extract_text_from_pdf(file_path: str) -> str:
+
+# Spread pages across worker processes only for PDFs at least this long;
+# PDFium extracts a page in a few milliseconds, so below this the cost of
+# re-opening the PDF in each worker outweighs the gain
+PARALLEL_PAGE_THRESHOLD = 32
+
+# PDFium emits CRLF line breaks and marks hyphenated line breaks with U+FFFE;
+# normalize to the "\n"-separated single-spaced lines the parsers expect
+_LINE_BREAK_RE = re.compile(r"\r\n?")
+_HYPHEN_BREAK = "\ufffe"
+_SPACES_RE = re.compile(r"[ \t]+")
+
+# PDFium is not thread-safe: no two calls may overlap, even on different
+# documents. Every in-process use goes through this lock (pool workers each
+# have their own copy, so it only serializes threads within one process)
+_PDFIUM_LOCK = threading.Lock()
+
+# Text runs closer than this (in PDF points) are joined without a space,
+# matching pdfplumber's default x_tolerance
+_WORD_GAP = 3
+
+
+def _page_text(page) -> str:
+    """
+    Extract and normalize the text of a single PDFium page, then close it.
+
+    PDFium returns text in content-stream order, which need not follow the
+    page layout (tables are often drawn column by column). Rebuild reading
+    order instead: take PDFium's text runs with their boxes, group them into
+    lines top to bottom and order each line left to right, so a table row's
+    description and figures come out on one line as the parsers expect.
+    """
+    textpage = page.get_textpage()
+    try:
+        runs = []
+        for index in range(textpage.count_rects()):
+            left, bottom, right, top = textpage.get_rect(index)
+            runs.append((left, bottom, right, top, textpage.get_text_bounded(left, bottom, right, top)))
+    finally:
+        textpage.close()
+        page.close()
+
+    # Highest vertical midpoint first; a run joins the current line when its
+    # midpoint falls inside the line's span or the line's midpoint inside the
+    # run's (so short glyphs such as quotes and commas stay on their line)
+    runs.sort(key=lambda run: -(run[1] + run[3]))
+    lines = []
+    line_bottom = line_top = None
+    for run in runs:
+        _, bottom, _, top, _ = run
+        if lines and (
+            line_bottom <= (bottom + top) / 2 <= line_top
+            or bottom <= (line_bottom + line_top) / 2 <= top
+        ):
+            lines[-1].append(run)
+            line_bottom, line_top = min(line_bottom, bottom), max(line_top, top)
+        else:
+            lines.append([run])
+            line_bottom, line_top = bottom, top
+
+    line_texts = []
+    for line in lines:
+        line.sort()
+        parts = []
+        previous_right = None
+        for left, _, right, _, run_text in line:
+            if previous_right is not None and left - previous_right > _WORD_GAP:
+                parts.append(" ")
+            parts.append(run_text)
+            previous_right = right
+        line_texts.append("".join(parts))
+
+    text = _LINE_BREAK_RE.sub("\n", "\n".join(line_texts)).replace(_HYPHEN_BREAK, "")
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+def _extract_pages(source: Union[str, bytes], start: int, stop: int) -> List[str]:
+    """
+    Extract text from pages [start, stop) of a PDF.
+
+    Runs inside pool workers, so it re-opens the PDF itself.
+
+    Args:
+        source: Path to the PDF file or its raw bytes
+        start: Index of the first page to extract
+        stop: Index one past the last page to extract
+
+    Returns:
+        Text of each non-empty page, in page order
+    """
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(source)
+        try:
+            page_texts = (_page_text(pdf[index]) for index in range(start, min(stop, len(pdf))))
+            return [page_text for page_text in page_texts if page_text]
+        finally:
+            pdf.close()
+
+
+def count_pages(source: Union[str, bytes]) -> int:
+    """
+    Count the pages of a PDF without extracting any text.
+
+    Args:
+        source: Path to the PDF file or its raw bytes
+
+    Returns:
+        Number of pages
+    """
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(source)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+
+def extract_text_from_pdf(
+    source: Union[str, bytes, BinaryIO],
+    page_executor: Optional[Executor] = None,
+    page_workers: Optional[int] = None
+) -> str:
     """
     Extract all text content from a PDF file.
-    
+
     Args:
-        file_path: Path to the PDF file
-        
+        source: Path to the PDF file, its raw bytes, or a binary file-like object
+        page_executor: Optional process pool used to extract page ranges of
+            long PDFs in parallel (source must then be a path or bytes)
+        page_workers: Number of workers in page_executor; the pages are split
+            into that many ranges (defaults to the CPU count)
+
     Returns:
         Concatenated text from all pages
     """
-    text_content = ""
-    
     try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_content += page_text + "\n"
+        with _PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(source)
+            try:
+                page_count = len(pdf)
+                if page_executor is None or page_count < PARALLEL_PAGE_THRESHOLD:
+                    page_texts = (_page_text(pdf[index]) for index in range(page_count))
+                    return "".join(page_text + "\n" for page_text in page_texts if page_text)
+            finally:
+                pdf.close()
+
+        # One contiguous page range per worker, joined back in page order
+        step = -(-page_count // min(page_count, page_workers or os.cpu_count() or 1))
+        starts = range(0, page_count, step)
+        chunks = page_executor.map(
+            _extract_pages,
+            [source] * len(starts),
+            starts,
+            [start + step for start in starts]
+        )
+        return "".join(page_text + "\n" for chunk in chunks for page_text in chunk)
     except Exception as e:
         raise Exception(f"Error reading PDF: {str(e)}")
-    
-    return text_content
@@ -0,0 +1,80 @@
+"""
+Tally Export Schema
+Column layout shared by the Excel and CSV generators
+"""
+
+from typing import Dict, Tuple
+
+
+# Tally export columns (24 columns - final structure with Product)
+TALLY_COLUMNS = [
+    "Sr. No.",
+    "Invoice Type",
+    "Product",
+    "Invoice No",
+    "Invoice Date",
+    "GST Registration",
+    "GST State",
+    "Party/Customer",
+    "Order No",
+    "Order Date",
+    "Invoice Period From",
+    "Invoice Period To",
+    "Billing Frequency",
+    "TDS Applicable",
+    "GST TDS Applicable",
+    "Ledger Name",
+    "Submitted Qty",
+    "Submitted Rate",
+    "Delivered Qty",
+    "Delivered Rate",
+    "Amount",
+    "CGST",
+    "SGST",
+    "Total Amount (with Tax)"
+]
+
+# (key, default) for the columns after Sr. No., Invoice Type and Product
+FIELD_DEFAULTS = (
+    ("invoice_no", ""),
+    ("invoice_date", ""),
+    ("gst_registration", ""),
+    ("gst_state", ""),
+    ("party_customer", ""),
+    ("order_no", ""),
+    ("order_date", ""),
+    ("invoice_period_from", ""),
+    ("invoice_period_to", ""),
+    ("billing_frequency", ""),
+    ("tds_applicable", "Yes"),
+    ("gst_tds_applicable", "No"),
+    ("ledger_name", ""),
+    ("submitted_qty", ""),
+    ("submitted_rate", ""),
+    ("delivered_qty", ""),
+    ("delivered_rate", ""),
+    ("amount", ""),
+    ("cgst", ""),
+    ("sgst", ""),
+    ("total_amount", "")
+)
+
+
+def project(invoice: Dict, sr_no: int) -> Tuple:
+    """
+    Build the TALLY_COLUMNS values for one invoice.
+
+    Args:
+        invoice: Extracted invoice data dictionary
+        sr_no: 1-based row number for the Sr. No. column
+
+    Returns:
+        Tuple of 24 values in TALLY_COLUMNS order
+    """
+    get = invoice.get
+    return (
+        sr_no,
+        get("invoice_type", "").upper(),  # Invoice Type (CloudXP/JTL/RJIL)
+        get("product", "SMS"),  # Product (default: SMS)
+        *[get(key, default) for key, default in FIELD_DEFAULTS]
+    )
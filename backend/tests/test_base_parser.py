@@ -2,69 +2,74 @@
 Unit tests for base parser utility methods.
 """
 
+import re
+
 import pytest
 from parsers.cloudxp_parser import CloudXPParser
 
 
+_INVOICE_NO_RE = re.compile(r"Invoice\s*Number\s*:?\s*([A-Z0-9]+)", re.IGNORECASE)
+
+
 class TestBaseParserMethods:
     """Test base parser utility methods through CloudXPParser instance."""
 
-    def setup_method(self):
-        self.parser = CloudXPParser()
+    @classmethod
+    def setup_class(cls):
+        cls.parser = CloudXPParser()
 
     # --- format_date tests ---
 
-    def test_format_date_dot_separator(self):
-        assert self.parser.format_date("15.11.2025") == "15/11/2025"
-
-    def test_format_date_dash_separator(self):
-        assert self.parser.format_date("15-11-2025") == "15/11/2025"
-
-    def test_format_date_slash_separator(self):
-        assert self.parser.format_date("15/11/2025") == "15/11/2025"
-
-    def test_format_date_month_abbr(self):
-        assert self.parser.format_date("15-Nov-2025") == "15/11/2025"
-
-    def test_format_date_month_full(self):
-        assert self.parser.format_date("15-November-2025") == "15/11/2025"
-
-    def test_format_date_iso(self):
-        assert self.parser.format_date("2025-11-15") == "15/11/2025"
-
-    def test_format_date_none(self):
-        assert self.parser.format_date(None) == ""
-
-    def test_format_date_empty(self):
-        assert self.parser.format_date("") == ""
+    @pytest.mark.parametrize("raw, expected", [
+        ("15.11.2025", "15/11/2025"),  # dot separator
+        ("15-11-2025", "15/11/2025"),  # dash separator
+        ("15/11/2025", "15/11/2025"),  # slash separator
+        ("15-Nov-2025", "15/11/2025"),  # month abbreviation
+        ("15-November-2025", "15/11/2025"),  # full month name
+        ("2025-11-15", "15/11/2025"),  # ISO
+        ("1.9.2025", "01/09/2025"),  # single-digit day and month
+        ("31-04-2025", "31-04-2025"),  # invalid day left unchanged
+        (None, ""),
+        ("", ""),
+    ])
+    def test_format_date(self, raw, expected):
+        assert self.parser.format_date(raw) == expected
 
     # --- clean_amount tests ---
 
-    def test_clean_amount_with_commas(self):
-        assert self.parser.clean_amount("1,23,456.78") == "123456.78"
-
-    def test_clean_amount_no_commas(self):
-        assert self.parser.clean_amount("123456.78") == "123456.78"
-
-    def test_clean_amount_none(self):
-        assert self.parser.clean_amount(None) == ""
+    @pytest.mark.parametrize("raw, expected", [
+        ("1,23,456.78", "123456.78"),
+        ("123456.78", "123456.78"),
+        (None, ""),
+    ])
+    def test_clean_amount(self, raw, expected):
+        assert self.parser.clean_amount(raw) == expected
 
     # --- calculate_billing_frequency tests ---
 
-    def test_billing_monthly(self):
-        assert self.parser.calculate_billing_frequency("01/11/2025", "30/11/2025") == "Monthly"
+    @pytest.mark.parametrize("start, end, expected", [
+        ("01/11/2025", "30/11/2025", "Monthly"),
+        ("01/10/2025", "31/12/2025", "Quarterly"),
+        ("01/07/2025", "31/12/2025", "Half-Yearly"),
+        ("01/01/2025", "31/12/2025", "Yearly"),
+        ("", "", ""),
+    ])
+    def test_billing_frequency(self, start, end, expected):
+        assert self.parser.calculate_billing_frequency(start, end) == expected
+
+    # --- parse_invoice_period tests ---
 
-    def test_billing_quarterly(self):
-        assert self.parser.calculate_billing_frequency("01/10/2025", "31/12/2025") == "Quarterly"
+    def test_period_spaced_dash(self):
+        assert self.parser.parse_invoice_period("01.10.2025 - 31.12.2025") == ("01/10/2025", "31/12/2025", "Quarterly")
 
-    def test_billing_half_yearly(self):
-        assert self.parser.calculate_billing_frequency("01/07/2025", "31/12/2025") == "Half-Yearly"
+    def test_period_to_with_dashed_dates(self):
+        assert self.parser.parse_invoice_period("01-Nov-2025 to 30-Nov-2025") == ("01/11/2025", "30/11/2025", "Monthly")
 
-    def test_billing_yearly(self):
-        assert self.parser.calculate_billing_frequency("01/01/2025", "31/12/2025") == "Yearly"
+    def test_period_en_dash(self):
+        assert self.parser.parse_invoice_period("01.11.2025–30.11.2025") == ("01/11/2025", "30/11/2025", "Monthly")
 
-    def test_billing_empty_dates(self):
-        assert self.parser.calculate_billing_frequency("", "") == ""
+    def test_period_empty(self):
+        assert self.parser.parse_invoice_period(None) == ("", "", "")
 
     # --- generate_ledger_name tests ---
 
@@ -82,29 +87,87 @@ class TestBaseParserMethods:
 
     # --- get_state_from_gst tests ---
 
-    def test_state_maharashtra(self):
-        assert self.parser.get_state_from_gst("27AABCN1234Q1ZM") == "Maharashtra"
-
-    def test_state_delhi(self):
-        assert self.parser.get_state_from_gst("07AABCD1234E1ZP") == "Delhi"
-
-    def test_state_karnataka(self):
-        assert self.parser.get_state_from_gst("29XYZPQ5678R1ZA") == "Karnataka"
-
-    def test_state_invalid_gst(self):
-        assert self.parser.get_state_from_gst("") == ""
-
-    def test_state_none_gst(self):
-        assert self.parser.get_state_from_gst(None) == ""
+    @pytest.mark.parametrize("gst, expected", [
+        ("27AABCN1234Q1ZM", "Maharashtra"),
+        ("07AABCD1234E1ZP", "Delhi"),
+        ("29XYZPQ5678R1ZA", "Karnataka"),
+        ("", ""),
+        (None, ""),
+    ])
+    def test_state_from_gst(self, gst, expected):
+        assert self.parser.get_state_from_gst(gst) == expected
 
     # --- extract_field tests ---
 
     def test_extract_field_match(self):
         text = "Invoice Number: ABC123"
-        result = self.parser.extract_field(text, r"Invoice\s*Number\s*:?\s*([A-Z0-9]+)")
+        result = self.parser.extract_field(text, _INVOICE_NO_RE)
         assert result == "ABC123"
 
     def test_extract_field_no_match(self):
         text = "Some other text"
-        result = self.parser.extract_field(text, r"Invoice\s*Number\s*:?\s*([A-Z0-9]+)")
+        result = self.parser.extract_field(text, _INVOICE_NO_RE)
         assert result is None
+
+    def test_extract_field_custom_flags(self):
+        text = "invoice number: INV123"
+        assert self.parser.extract_field(text, r"Invoice Number: (\w+)", flags=0) is None
+        assert self.parser.extract_field(text, r"Invoice Number: (\w+)") == "INV123"
+
+    # --- extract_gst_state tests ---
+
+    def test_gst_state_from_gst_number(self):
+        assert self.parser.extract_gst_state("06 Haryana", "27AABCN1234Q1ZM") == "Maharashtra"
+
+    def test_gst_state_place_of_supply_code_prefix(self):
+        assert self.parser.extract_gst_state("06 Haryana") == "Haryana"
+
+    def test_gst_state_place_of_supply_code_suffix(self):
+        assert self.parser.extract_gst_state("Maharashtra,27") == "Maharashtra"
+
+    def test_gst_state_empty(self):
+        assert self.parser.extract_gst_state(None) == ""
+
+    # --- parse_fields tests ---
+
+    def test_parse_fields_overlapping_matches(self):
+        text = "PO Number: ASL/ 5500546061 PO Date: 10.08.2025"
+        spec = {
+            "order_no": r"PO\s*Number\s*:?\s*([A-Z0-9/\s]+?)(?:\s*PO\s*Date|\s*\n|$)",
+            "order_date": r"PO\s*Date\s*:?\s*(\d{2}\.\d{2}\.\d{4})",
+        }
+        assert self.parser.parse_fields(text, spec) == {
+            "order_no": "ASL/ 5500546061",
+            "order_date": "10.08.2025",
+        }
+
+    def test_parse_fields_missing_field_absent(self):
+        spec = {"invoice_no": r"Invoice\s*Number\s*:?\s*([A-Z0-9]+)"}
+        assert self.parser.parse_fields("Some other text", spec) == {}
+
+    # --- clean_remarks tests ---
+
+    def test_clean_remarks_strips_prefix(self):
+        assert self.parser.clean_remarks("Bulk SMS Service - Nov billing ") == "NOV BILLING"
+
+    def test_clean_remarks_empty(self):
+        assert self.parser.clean_remarks(None) == ""
+
+    # --- search_anchored tests ---
+
+    def test_search_anchored_leftmost_match(self):
+        pattern = re.compile(r"BSS\s*SERVICE\s*CHARGE\s+(\d+)", re.IGNORECASE)
+        text = "bss note\nBss Service Charge 111\nBSS SERVICE CHARGE 222"
+        match = self.parser.search_anchored(pattern, text, text.lower(), "bss")
+        assert match.group(1) == "111"
+
+    def test_search_anchored_no_match(self):
+        pattern = re.compile(r"BSS\s*SERVICE\s*CHARGE\s+(\d+)", re.IGNORECASE)
+        text = "BSS SERVICE CHARGE pending"
+        assert self.parser.search_anchored(pattern, text, text.lower(), "bss") is None
+
+    def test_search_anchored_multiple_anchors(self):
+        pattern = re.compile(r"(?:SMS\s*SCRUBBING|DLT\s*COUNT)\s+(\d+)", re.IGNORECASE)
+        text = "SMS only\nDLT COUNT 42"
+        match = self.parser.search_anchored(pattern, text, text.lower(), "sms", "dlt")
+        assert match.group(1) == "42"
@@ -4,9 +4,11 @@ Unit tests for Excel and CSV generator services.
 
 import pytest
 import io
-from openpyxl import load_workbook
+import zipfile
+import xml.etree.ElementTree as ET
 from services.excel_generator import generate_excel, TALLY_COLUMNS
 from services.csv_generator import generate_csv, TALLY_COLUMNS as CSV_COLUMNS
+from services.tally_schema import project
 
 
 SAMPLE_DATA = [
@@ -38,60 +40,152 @@ SAMPLE_DATA = [
 ]
 
 
+class TestTallySchema:
+    """Test the shared row projection."""
+
+    def test_project_matches_columns(self):
+        row = project(SAMPLE_DATA[0], 1)
+        assert len(row) == len(TALLY_COLUMNS)
+        assert row[:4] == (1, "CLOUDXP", "SMS", "INV001")
+        assert row[-1] == "11800.00"
+
+    def test_project_defaults(self):
+        row = project({}, 7)
+        assert row[:3] == (7, "", "SMS")
+        assert row[TALLY_COLUMNS.index("TDS Applicable")] == "Yes"
+        assert row[TALLY_COLUMNS.index("GST TDS Applicable")] == "No"
+
+
+_XLSX_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+def _column_index(cell_ref):
+    """0-based column index of a cell reference like "D2"."""
+    index = 0
+    for char in cell_ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - ord("A") + 1
+    return index - 1
+
+
+def _cell_value(cell, zf):
+    """Text of a <c> element, resolving inline and shared strings."""
+    cell_type = cell.get("t")
+    if cell_type == "inlineStr":
+        return "".join(t.text or "" for t in cell.iter(_XLSX_NS + "t"))
+    value = cell.find(_XLSX_NS + "v")
+    if value is None:
+        return None
+    if cell_type == "s":
+        shared = ET.fromstring(zf.read("xl/sharedStrings.xml"))
+        item = shared.findall(_XLSX_NS + "si")[int(value.text)]
+        return "".join(t.text or "" for t in item.iter(_XLSX_NS + "t"))
+    return value.text
+
+
+def _read_row(buf, row_idx):
+    """
+    Read one row of the first sheet straight from the XLSX zip.
+
+    Stops parsing as soon as the row has been seen, skipping the styles
+    and workbook setup load_workbook does. Numbers come back as strings.
+
+    Returns:
+        List of cell values (None for blank cells), or None if the row is absent
+    """
+    with zipfile.ZipFile(io.BytesIO(buf)) as zf:
+        with zf.open("xl/worksheets/sheet1.xml") as sheet:
+            for _, elem in ET.iterparse(sheet, events=("end",)):
+                if elem.tag != _XLSX_NS + "row":
+                    continue
+                current = int(elem.get("r"))
+                if current > row_idx:
+                    break
+                if current == row_idx:
+                    cells = elem.findall(_XLSX_NS + "c")
+                    values = [None] * (_column_index(cells[-1].get("r")) + 1) if cells else []
+                    for cell in cells:
+                        values[_column_index(cell.get("r"))] = _cell_value(cell, zf)
+                    return values
+    return None
+
+
+def _sheet_name(buf):
+    """Name of the first sheet, read from xl/workbook.xml."""
+    with zipfile.ZipFile(io.BytesIO(buf)) as zf:
+        workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    return workbook.find(f"{_XLSX_NS}sheets/{_XLSX_NS}sheet").get("name")
+
+
+@pytest.fixture(scope="module")
+def excel_buffer():
+    """Rendered Excel bytes for SAMPLE_DATA, generated once per module."""
+    return generate_excel(SAMPLE_DATA).getvalue()
+
+
 class TestExcelGenerator:
     def test_generates_valid_excel(self):
         buffer = generate_excel(SAMPLE_DATA)
         assert buffer is not None
-        assert buffer.getvalue()[:4] == b"PK\x03\x04"  # ZIP/XLSX magic bytes
+        assert bytes(buffer.getbuffer()[:4]) == b"PK\x03\x04"  # ZIP/XLSX magic bytes
 
-    def test_has_correct_headers(self):
-        buffer = generate_excel(SAMPLE_DATA)
-        wb = load_workbook(io.BytesIO(buffer.getvalue()))
-        ws = wb.active
-        headers = [ws.cell(row=1, column=i).value for i in range(1, len(TALLY_COLUMNS) + 1)]
-        assert headers == TALLY_COLUMNS
+    def test_has_correct_headers(self, excel_buffer):
+        assert _read_row(excel_buffer, 1) == TALLY_COLUMNS
 
-    def test_has_data_row(self):
-        buffer = generate_excel(SAMPLE_DATA)
-        wb = load_workbook(io.BytesIO(buffer.getvalue()))
-        ws = wb.active
-        assert ws.cell(row=2, column=4).value == "INV001"
+    def test_has_data_row(self, excel_buffer):
+        assert _read_row(excel_buffer, 2)[3] == "INV001"
 
     def test_empty_data(self):
-        buffer = generate_excel([])
-        wb = load_workbook(io.BytesIO(buffer.getvalue()))
-        ws = wb.active
-        assert ws.max_row == 1  # Only headers
+        buffer = generate_excel([]).getvalue()
+        assert _read_row(buffer, 1) == TALLY_COLUMNS
+        assert _read_row(buffer, 2) is None  # Only headers
 
-    def test_sheet_name(self):
-        buffer = generate_excel(SAMPLE_DATA)
-        wb = load_workbook(io.BytesIO(buffer.getvalue()))
-        assert wb.active.title == "Tally Import"
+    def test_sheet_name(self, excel_buffer):
+        assert _sheet_name(excel_buffer) == "Tally Import"
+
+    def test_writes_to_out_stream(self):
+        # Only test that needs openpyxl; imported here so the rest of the
+        # module does not pay for it
+        from openpyxl import load_workbook
+
+        out = io.BytesIO()
+        assert generate_excel(SAMPLE_DATA, out) is None
+        out.seek(0)
+        wb = load_workbook(out)
+        assert wb.active.cell(row=2, column=4).value == "INV001"
+
+
+@pytest.fixture(scope="module")
+def csv_bytes():
+    """Rendered CSV bytes for SAMPLE_DATA, generated once per module."""
+    return generate_csv(SAMPLE_DATA).getvalue()
+
+
+@pytest.fixture(scope="module")
+def csv_text(csv_bytes):
+    """csv_bytes decoded once, BOM stripped."""
+    return csv_bytes.decode("utf-8-sig")
 
 
 class TestCSVGenerator:
-    def test_generates_valid_csv(self):
-        buffer = generate_csv(SAMPLE_DATA)
-        content = buffer.getvalue().decode("utf-8-sig")
-        assert "Sr. No." in content
-        assert "INV001" in content
+    def test_generates_valid_csv(self, csv_bytes):
+        assert csv_bytes.startswith(b"\xef\xbb\xbf")  # BOM for Excel
+        assert b"Sr. No." in csv_bytes
+        assert b"INV001" in csv_bytes
 
-    def test_has_correct_headers(self):
-        buffer = generate_csv(SAMPLE_DATA)
-        content = buffer.getvalue().decode("utf-8-sig")
-        first_line = content.split("\r\n")[0]
+    def test_has_correct_headers(self, csv_text):
+        first_line = csv_text.partition("\r\n")[0]
         for col in ["Sr. No.", "Invoice Type", "Invoice No", "Total Amount (with Tax)"]:
             assert col in first_line
 
-    def test_has_data_row(self):
-        buffer = generate_csv(SAMPLE_DATA)
-        content = buffer.getvalue().decode("utf-8-sig")
-        lines = content.strip().split("\r\n")
+    def test_has_data_row(self, csv_text):
+        lines = csv_text.splitlines()
         assert len(lines) == 2  # header + 1 data row
         assert "INV001" in lines[1]
 
     def test_empty_data(self):
         buffer = generate_csv([])
         content = buffer.getvalue().decode("utf-8-sig")
-        lines = content.strip().split("\r\n")
+        lines = content.splitlines()
         assert len(lines) == 1  # header only
@@ -97,93 +97,87 @@ Remarks: Bulk SMS Service - TRANSACTIONAL
 """
 
 
-# --- CloudXP Parser Tests ---
-
-class TestCloudXPParser:
-    def setup_method(self):
-        self.parser = CloudXPParser()
+# Exact values expected from parsing each sample text
+
+EXPECTED_CLOUDXP = {
+    "invoice_no": "CXP2025001234",
+    "invoice_date": "15/11/2025",
+    "gst_registration": "27AABCN1234Q1ZM",
+    "gst_state": "Maharashtra",
+    "party_customer": "NSE CLEARING LIMITED",
+    "order_date": "10/08/2025",
+    "invoice_period_from": "01/11/2025",
+    "invoice_period_to": "30/11/2025",
+    "billing_frequency": "Monthly",
+    "delivered_qty": "9881102",
+    "delivered_rate": "0.090000",
+    "submitted_qty": "12394994",
+    "submitted_rate": "0.020000",
+    "amount": "1137199.06",
+    "cgst": "102347.92",
+    "sgst": "102347.92",
+    "total_amount": "1341894.90",
+    "tds_applicable": "Yes",
+    "gst_tds_applicable": "No",
+    "ledger_name": "Bulk SMS Charges - Nov-25 to Nov-25",
+}
+
+EXPECTED_RJIL = {
+    "invoice_no": "987654321",
+    "invoice_date": "25/10/2025",
+    "gst_registration": "27AAGCR1234E1ZR",
+    "gst_state": "Maharashtra",
+    "party_customer": "NSE CLEARING LIMITED",  # cut at the address comma
+    "order_no": "2526NSCCLIT94",
+    "order_date": "01/10/2025",
+    "invoice_period_from": "01/10/2025",
+    "invoice_period_to": "31/10/2025",
+    "billing_frequency": "Monthly",
+    "delivered_qty": "500000",
+    "amount": "75000.00",
+    "cgst": "6750.00",
+    "sgst": "6750.00",
+    "total_amount": "88500.00",
+    "submitted_qty": "",  # RJIL only has bulk SMS, no separate submitted qty
+}
+
+EXPECTED_JTL = {
+    "invoice_no": "JTL2025004567",
+    "invoice_date": "20/12/2025",
+    "gst_registration": "27AABCJ5678P1Z5",
+    "gst_state": "Maharashtra",
+    "party_customer": "BHARATIYA JANATA PARTY",
+    "order_no": "77001234",
+    "order_date": "",  # JTL invoices don't have Order Date
+    "invoice_period_from": "01/12/2025",
+    "invoice_period_to": "31/12/2025",
+    "billing_frequency": "Monthly",
+    "submitted_qty": "50000",  # from DLT row
+    "submitted_rate": "0.020000",
+    "delivered_qty": "250000",  # from BSS row
+    "delivered_rate": "0.080000",
+    "amount": "21000.00",
+    "cgst": "1890.00",
+    "sgst": "1890.00",
+    "total_amount": "24780.00",
+    "ledger_name": "Bulk SMS Charges - Dec-25 to Dec-25",
+}
 
-    def test_invoice_number(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["invoice_no"] == "CXP2025001234"
 
-    def test_invoice_date(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["invoice_date"] == "15/11/2025"
-
-    def test_gst_registration(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["gst_registration"] == "27AABCN1234Q1ZM"
+# --- CloudXP Parser Tests ---
 
-    def test_gst_state(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["gst_state"] == "Maharashtra"
+class TestCloudXPParser:
+    @classmethod
+    def setup_class(cls):
+        cls.parser = CloudXPParser()
+        cls.result = cls.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
 
-    def test_party_customer(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["party_customer"] == "NSE CLEARING LIMITED"
+    def test_all_fields(self):
+        assert {k: self.result[k] for k in EXPECTED_CLOUDXP} == EXPECTED_CLOUDXP
 
     def test_order_no(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert "5500546061" in result["order_no"]
-
-    def test_order_date(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["order_date"] == "10/08/2025"
-
-    def test_invoice_period(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["invoice_period_from"] == "01/11/2025"
-        assert result["invoice_period_to"] == "30/11/2025"
-
-    def test_billing_frequency_monthly(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["billing_frequency"] == "Monthly"
-
-    def test_delivered_qty(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["delivered_qty"] == "9881102"
-
-    def test_delivered_rate(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["delivered_rate"] == "0.090000"
-
-    def test_submitted_qty(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["submitted_qty"] == "12394994"
-
-    def test_submitted_rate(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["submitted_rate"] == "0.020000"
-
-    def test_amount(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["amount"] == "1137199.06"
-
-    def test_cgst(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["cgst"] == "102347.92"
-
-    def test_sgst(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["sgst"] == "102347.92"
-
-    def test_total_amount(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["total_amount"] == "1341894.90"
-
-    def test_tds_applicable(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["tds_applicable"] == "Yes"
-
-    def test_gst_tds_applicable(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert result["gst_tds_applicable"] == "No"
-
-    def test_ledger_name(self):
-        result = self.parser.parse(CLOUDXP_SAMPLE_TEXT, "test.pdf")
-        assert "Bulk SMS Charges" in result["ledger_name"]
-        assert "Nov-25" in result["ledger_name"]
+        # PO prefix ("ASL/ ") varies by customer; the number is what matters
+        assert self.result["order_no"].endswith("5500546061")
 
     def test_empty_text(self):
         result = self.parser.parse("", "empty.pdf")
@@ -194,70 +188,13 @@ class TestCloudXPParser:
 # --- RJIL Parser Tests ---
 
 class TestRJILParser:
-    def setup_method(self):
-        self.parser = RJILParser()
-
-    def test_invoice_number(self):
-        result = self.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
-        assert result["invoice_no"] == "987654321"
+    @classmethod
+    def setup_class(cls):
+        cls.parser = RJILParser()
+        cls.result = cls.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
 
-    def test_invoice_date(self):
-        result = self.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
-        assert result["invoice_date"] == "25/10/2025"
-
-    def test_gst_registration(self):
-        result = self.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
-        assert result["gst_registration"] == "27AAGCR1234E1ZR"
-
-    def test_gst_state(self):
-        result = self.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
-        assert result["gst_state"] == "Maharashtra"
-
-    def test_party_customer(self):
-        result = self.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
-        assert "NSE CLEARING LIMITED" in result["party_customer"]
-
-    def test_order_no(self):
-        result = self.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
-        assert result["order_no"] == "2526NSCCLIT94"
-
-    def test_order_date(self):
-        result = self.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
-        assert result["order_date"] == "01/10/2025"
-
-    def test_invoice_period(self):
-        result = self.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
-        assert result["invoice_period_from"] == "01/10/2025"
-        assert result["invoice_period_to"] == "31/10/2025"
-
-    def test_billing_frequency(self):
-        result = self.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
-        assert result["billing_frequency"] == "Monthly"
-
-    def test_delivered_qty(self):
-        result = self.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
-        assert result["delivered_qty"] == "500000"
-
-    def test_amount(self):
-        result = self.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
-        assert result["amount"] == "75000.00"
-
-    def test_cgst(self):
-        result = self.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
-        assert result["cgst"] == "6750.00"
-
-    def test_sgst(self):
-        result = self.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
-        assert result["sgst"] == "6750.00"
-
-    def test_total_amount(self):
-        result = self.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
-        assert result["total_amount"] == "88500.00"
-
-    def test_submitted_qty_empty_for_rjil(self):
-        """RJIL only has bulk SMS, no separate submitted qty."""
-        result = self.parser.parse(RJIL_SAMPLE_TEXT, "test.pdf")
-        assert result["submitted_qty"] == ""
+    def test_all_fields(self):
+        assert {k: self.result[k] for k in EXPECTED_RJIL} == EXPECTED_RJIL
 
     def test_empty_text(self):
         result = self.parser.parse("", "empty.pdf")
@@ -267,83 +204,13 @@ class TestRJILParser:
 # --- JTL Parser Tests ---
 
 class TestJTLParser:
-    def setup_method(self):
-        self.parser = JTLParser()
-
-    def test_invoice_number(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["invoice_no"] == "JTL2025004567"
+    @classmethod
+    def setup_class(cls):
+        cls.parser = JTLParser()
+        cls.result = cls.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
 
-    def test_invoice_date(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["invoice_date"] == "20/12/2025"
-
-    def test_gst_registration(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["gst_registration"] == "27AABCJ5678P1Z5"
-
-    def test_gst_state(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["gst_state"] == "Maharashtra"
-
-    def test_party_customer(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert "BHARATIYA JANATA PARTY" in result["party_customer"]
-
-    def test_order_no(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["order_no"] == "77001234"
-
-    def test_order_date_empty_for_jtl(self):
-        """JTL invoices don't have Order Date."""
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["order_date"] == ""
-
-    def test_invoice_period(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["invoice_period_from"] == "01/12/2025"
-        assert result["invoice_period_to"] == "31/12/2025"
-
-    def test_billing_frequency(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["billing_frequency"] == "Monthly"
-
-    def test_submitted_qty_from_dlt(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["submitted_qty"] == "50000"
-
-    def test_submitted_rate_from_dlt(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["submitted_rate"] == "0.020000"
-
-    def test_delivered_qty_from_bss(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["delivered_qty"] == "250000"
-
-    def test_delivered_rate_from_bss(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["delivered_rate"] == "0.080000"
-
-    def test_amount(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["amount"] == "21000.00"
-
-    def test_cgst(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["cgst"] == "1890.00"
-
-    def test_sgst(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["sgst"] == "1890.00"
-
-    def test_total_amount(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert result["total_amount"] == "24780.00"
-
-    def test_ledger_name(self):
-        result = self.parser.parse(JTL_SAMPLE_TEXT, "test.pdf")
-        assert "Bulk SMS Charges" in result["ledger_name"]
-        assert "Dec-25" in result["ledger_name"]
+    def test_all_fields(self):
+        assert {k: self.result[k] for k in EXPECTED_JTL} == EXPECTED_JTL
 
     def test_empty_text(self):
         result = self.parser.parse("", "empty.pdf")
@@ -0,0 +1,102 @@
+"""
+Unit tests for PDF text extraction.
+Builds small invoice PDFs whose content stream draws the text column by
+column, so only layout-ordered extraction yields the lines parsers expect.
+"""
+
+import io
+import pytest
+import pypdfium2 as pdfium
+from concurrent.futures import ThreadPoolExecutor
+from services.pdf_extractor import PARALLEL_PAGE_THRESHOLD, extract_text_from_pdf
+from parsers.cloudxp_parser import CloudXPParser
+from parsers.rjil_parser import RJILParser
+from parsers.jtl_parser import JTLParser
+from tests.test_parsers import (
+    CLOUDXP_SAMPLE_TEXT, RJIL_SAMPLE_TEXT, JTL_SAMPLE_TEXT,
+    EXPECTED_CLOUDXP, EXPECTED_RJIL, EXPECTED_JTL,
+)
+
+
+def build_column_ordered_pdf(text: str, font_size: int = 9) -> bytes:
+    """
+    Lay a text out one word per cell, line by line, and draw it column by column.
+
+    Every first word is drawn before any second word, and so on, so the
+    content stream order differs from reading order on every line.
+    """
+    cells = []
+    for row, line in enumerate(line for line in text.splitlines() if line.strip()):
+        x = 40
+        for column, word in enumerate(line.split()):
+            cells.append((column, row, x, 800 - row * 14, word))
+            # Generous Helvetica width estimate keeps words apart
+            x += len(word) * font_size * 0.8 + 6
+    cells.sort()
+
+    escape = str.maketrans({"\\": "\\\\", "(": "\\(", ")": "\\)"})
+    content = "\n".join(
+        f"BT /F1 {font_size} Tf {x:.1f} {y} Td ({word.translate(escape)}) Tj ET"
+        for _, _, x, y, word in cells
+    ).encode("latin-1")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+    ]
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+def build_blank_pdf(page_count: int) -> bytes:
+    """Build a PDF of blank pages."""
+    pdf = pdfium.PdfDocument.new()
+    for _ in range(page_count):
+        pdf.new_page(595, 842).close()
+    buffer = io.BytesIO()
+    pdf.save(buffer)
+    pdf.close()
+    return buffer.getvalue()
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+    """Thread pool that records the page-range start of every task it runs."""
+
+    def map(self, fn, *iterables, **kwargs):
+        self.range_starts = list(iterables[1])
+        return super().map(fn, *iterables, **kwargs)
+
+
+class TestExtractTextFromPdf:
+    def test_lines_in_reading_order(self):
+        text = extract_text_from_pdf(build_column_ordered_pdf(CLOUDXP_SAMPLE_TEXT))
+        assert "1 SMS Service 998599 98,81,102.00 0.090000 8,89,299.18" in text.splitlines()
+
+    @pytest.mark.parametrize("parser, sample_text, expected", [
+        (CloudXPParser(), CLOUDXP_SAMPLE_TEXT, EXPECTED_CLOUDXP),
+        (RJILParser(), RJIL_SAMPLE_TEXT, EXPECTED_RJIL),
+        (JTLParser(), JTL_SAMPLE_TEXT, EXPECTED_JTL),
+    ], ids=["cloudxp", "rjil", "jtl"])
+    def test_parsed_fields(self, parser, sample_text, expected):
+        """Table rows drawn column by column must still parse to the same fields."""
+        text = extract_text_from_pdf(build_column_ordered_pdf(sample_text))
+        result = parser.parse(text, "test.pdf")
+        assert {k: result[k] for k in expected} == expected
+
+    def test_page_ranges_match_pool_size(self):
+        """Long PDFs are split into one page range per pool worker, not per CPU."""
+        with RecordingExecutor(max_workers=2) as executor:
+            extract_text_from_pdf(build_blank_pdf(PARALLEL_PAGE_THRESHOLD + 1), executor, page_workers=2)
+        assert executor.range_starts == [0, PARALLEL_PAGE_THRESHOLD // 2 + 1]